@@ -0,0 +1,62 @@
+"""
+Substitució d'alias memoritzats en una sola passada
+Tots els alias es compilen en una única expressió regular construïda a partir
+d'un trie de caràcters (els prefixos comuns es comparteixen), de manera que
+el cost no creix amb el nombre d'alias sinó amb la longitud del text. Les
+substitucions no es tornen a examinar (no hi ha cascades) i, a cada posició,
+guanya l'alias més llarg que acaba en un límit de paraula.
+"""
+
+import re
+
+_END = ''
+
+
+def _trie_pattern(node: dict) -> str:
+    alternatives = [re.escape(ch) + _trie_pattern(child)
+                    for ch, child in sorted(node.items()) if ch != _END]
+    if not alternatives:
+        return ''
+    body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    if _END in node:
+        # El quantificador ? és voraç: primer prova la continuació més llarga
+        body = '(?:' + body + ')?'
+    return body
+
+
+def compile_aliases(originals) -> re.Pattern | None:
+    """Compila els textos originals en un patró amb límits de paraula (None si no n'hi ha)."""
+    root: dict = {}
+    for original in originals:
+        if not original:
+            continue
+        node = root
+        for ch in original:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+    if not root:
+        return None
+    return re.compile(r'(?<!\w)' + _trie_pattern(root) + r'(?!\w)')
+
+
+class AliasMatcher:
+    """Aplica un diccionari {original: correcció} sobre un text en una sola passada."""
+
+    def __init__(self, aliases: dict[str, str]):
+        self.aliases = {k: v for k, v in aliases.items() if k and k != v}
+        self.pattern = compile_aliases(self.aliases)
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def apply(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda m: self.aliases[m.group(0)], text)
+
+    def finditer(self, text: str):
+        """Retorna (inici, fi, original, correcció) per a cada coincidència."""
+        if self.pattern is None:
+            return
+        for m in self.pattern.finditer(text):
+            yield m.start(), m.end(), m.group(0), self.aliases[m.group(0)]
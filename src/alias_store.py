@@ -0,0 +1,134 @@
+"""
+Memòria cau d'alias memoritzats per a tot el procés
+Canvis-Memoritzats.md i els semantic_memory.json de cada sèrie es llegeixen
+una sola vegada i es tornen a llegir només si en canvia la data de
+modificació. També es guarden els AliasMatcher ja compilats, de manera que un
+lot de notes de la mateixa sèrie comparteix el mateix autòmat.
+
+Els diccionaris retornats són compartits: no s'han de modificar.
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+
+from alias_matcher import AliasMatcher
+
+GLOBAL_MEMORIZED = Path('zConfig') / 'Canvis-Memoritzats.md'
+MAX_PARENT_LEVELS = 6
+
+_lock = threading.Lock()
+_config_paths: dict[Path, Path | None] = {}
+_parsed: dict[Path, tuple[int, dict]] = {}
+_matchers: dict[tuple, AliasMatcher] = {}
+_stats = {'parsed': 0, 'hits': 0, 'compiled': 0}
+
+
+def _mtime(path: Path | None) -> int | None:
+    try:
+        return path.stat().st_mtime_ns if path else None
+    except OSError:
+        return None
+
+
+def find_global_memorized(start_dir) -> Path | None:
+    """Busca zConfig/Canvis-Memoritzats.md pujant des de start_dir.
+
+    Un cop trobat, el camí queda resolt per a aquest directori; si no es troba
+    es torna a buscar a la crida següent (el fitxer es pot crear més tard).
+    """
+    start_dir = Path(start_dir)
+    with _lock:
+        if start_dir in _config_paths:
+            return _config_paths[start_dir]
+    found = None
+    current = start_dir
+    for _ in range(MAX_PARENT_LEVELS):
+        candidate = current / GLOBAL_MEMORIZED
+        if candidate.exists():
+            found = candidate
+            break
+        current = current.parent
+    if found is not None:
+        with _lock:
+            _config_paths[start_dir] = found
+    return found
+
+
+def _parse_memorized(path: Path) -> dict:
+    result = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
+        m = re.match(r'^-\s+(.+?)\s+→\s+(.+)$', line)
+        if m:
+            result[m.group(1)] = m.group(2)
+    return result
+
+
+def _parse_json(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _cached(path: Path | None, parse) -> dict:
+    mtime = _mtime(path)
+    if mtime is None:
+        return {}
+    with _lock:
+        entry = _parsed.get(path)
+        if entry and entry[0] == mtime:
+            _stats['hits'] += 1
+            return entry[1]
+    data = parse(path)
+    with _lock:
+        _parsed[path] = (mtime, data)
+        _stats['parsed'] += 1
+    return data
+
+
+def global_aliases(path: Path | None) -> dict[str, str]:
+    """Alias de Canvis-Memoritzats.md ({} si no existeix)."""
+    return _cached(Path(path) if path else None, _parse_memorized)
+
+
+def semantic_memory(path: Path | None) -> dict:
+    """Contingut de semantic_memory.json ({} si no existeix o no és vàlid)."""
+    return _cached(Path(path) if path else None, _parse_json)
+
+
+def local_aliases(path: Path | None) -> dict[str, str]:
+    return semantic_memory(path).get('aliases', {})
+
+
+def alias_matcher(global_path: Path | None, semantic_memory_path: Path | None) -> AliasMatcher:
+    """Matcher amb els alias globals i els de la sèrie (els locals tenen prioritat)."""
+    global_path = Path(global_path) if global_path else None
+    semantic_memory_path = Path(semantic_memory_path) if semantic_memory_path else None
+    key = (global_path, _mtime(global_path), semantic_memory_path, _mtime(semantic_memory_path))
+    with _lock:
+        matcher = _matchers.get(key)
+    if matcher is not None:
+        return matcher
+    matcher = AliasMatcher({**global_aliases(global_path), **local_aliases(semantic_memory_path)})
+    with _lock:
+        # Els matchers de versions anteriors dels mateixos fitxers ja no serveixen
+        for old in [k for k in _matchers if k[0] == global_path and k[2] == semantic_memory_path]:
+            del _matchers[old]
+        _matchers[key] = matcher
+        _stats['compiled'] += 1
+    return matcher
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, files=len(_parsed), matchers=len(_matchers))
+
+
+def clear():
+    with _lock:
+        _config_paths.clear()
+        _parsed.clear()
+        _matchers.clear()
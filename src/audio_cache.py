@@ -0,0 +1,69 @@
+"""
+Memòria cau d'àudio descodificat (PCM mono 16 kHz float32 en .npy)
+Cada fitxer es descodifica amb ffmpeg/PyAV una sola vegada; les lectures
+posteriors (transcripció, fragmentació VAD, benchmarks) obren el .npy amb
+mmap, sense copiar-lo a memòria.
+
+Només s'escriu quan es reutilitzarà (persist=True: benchmarks, calibratge,
+fragments compartits entre processos, transcripcions que es poden reprendre).
+Una transcripció puntual llegeix el .npy si ja hi és i, si no, descodifica en
+memòria sense deixar-ne cap còpia a disc.
+"""
+
+import os
+from pathlib import Path
+
+from transcription_cache import file_sha256
+
+AUDIO_CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'audio_cache'
+MAX_AUDIO_CACHE_MB = int(os.getenv('AUDIO_CACHE_MB', '2000'))
+SAMPLE_RATE = 16000
+TMP_SUFFIX = '.tmp.npy'
+
+
+def cached_audio_path(audio_path, audio_hash: str | None = None, cache_dir: Path = AUDIO_CACHE_DIR) -> Path:
+    """Descodifica l'àudio si cal i retorna la ruta del .npy a la memòria cau."""
+    cache_dir = Path(cache_dir)
+    npy_path = cache_dir / f"{audio_hash or file_sha256(audio_path)}.npy"
+    if npy_path.exists():
+        os.utime(npy_path)   # marca l'accés per a l'LRU
+        return npy_path
+
+    import numpy as np
+    from faster_whisper.audio import decode_audio
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    audio = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE).astype(np.float32, copy=False)
+    tmp = npy_path.with_suffix(TMP_SUFFIX)
+    np.save(tmp, audio)
+    tmp.replace(npy_path)
+    _evict(cache_dir)
+    return npy_path
+
+
+def decoded_audio(audio_path, audio_hash: str | None = None, cache_dir: Path = AUDIO_CACHE_DIR,
+                  persist: bool = True):
+    """Retorna l'àudio float32 de 16 kHz mono.
+
+    Si és a la memòria cau (o persist=True), com a np.memmap de només lectura;
+    altrament es descodifica en memòria i no s'escriu res.
+    """
+    import numpy as np
+    npy_path = Path(cache_dir) / f"{audio_hash or file_sha256(audio_path)}.npy"
+    if not persist and not npy_path.exists():
+        from faster_whisper.audio import decode_audio
+        return decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE).astype(np.float32, copy=False)
+    return np.load(cached_audio_path(audio_path, npy_path.stem, cache_dir), mmap_mode='r')
+
+
+def _evict(cache_dir: Path, max_bytes: int = MAX_AUDIO_CACHE_MB * 1024 * 1024):
+    # Els .tmp.npy són escriptures en curs d'un altre procés: ni compten ni s'eliminen
+    entries = sorted((p for p in cache_dir.glob('*.npy') if not p.name.endswith(TMP_SUFFIX)),
+                     key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in entries)
+    # L'entrada més recent (la que s'acaba d'escriure) no s'elimina mai
+    for p in entries[:-1]:
+        if total <= max_bytes:
+            break
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
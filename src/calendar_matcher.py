@@ -72,3 +72,22 @@ class CalendarMatcher:
             'duration': str(end_dt - start_dt),
             'attendees': attendees
         }
+
+    def find_event_at(self, when: datetime, lookback=timedelta(hours=3)):
+        """Retorna la reunió (amb assistents) que acaba més a prop de 'when', o None.
+
+        Pensat per a gravacions: el fitxer s'acaba d'escriure quan acaba la reunió.
+        """
+        events = self.service.events().list(
+            calendarId='primary',
+            timeMin=(when - lookback).isoformat(),
+            timeMax=(when + timedelta(minutes=30)).isoformat(),
+            singleEvents=True,
+            orderBy='startTime'
+        ).execute().get('items', [])
+        reunions = [self._parse_event(e) for e in events
+                    if 'attendees' in e and 'dateTime' in e['start']]
+        reunions = [r for r in reunions if r['start'] <= when]
+        if not reunions:
+            return None
+        return min(reunions, key=lambda r: abs((r['end'] - when).total_seconds()))
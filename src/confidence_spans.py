@@ -0,0 +1,116 @@
+"""
+Índex de trams de baixa confiança d'una transcripció (<nota>.spans.json)
+Amb word_timestamps=True, faster-whisper dona la probabilitat de cada paraula.
+Les paraules consecutives per sota del llindar formen un tram; el corrector
+només envia aquests trams (amb una mica de context) al LLM en lloc de tota
+la transcripció.
+"""
+
+import json
+import re
+from pathlib import Path
+
+SPANS_SUFFIX = '.spans.json'
+LOW_WORD_PROB = 0.5
+CONTEXT_CHARS = 160
+
+
+def spans_path(note_path) -> Path:
+    note_path = Path(note_path)
+    return note_path.with_name(note_path.stem + SPANS_SUFFIX)
+
+
+def extract_spans(segments: list[dict], threshold: float = LOW_WORD_PROB) -> list[dict]:
+    """Agrupa les paraules consecutives amb probabilitat < threshold.
+
+    Cada segment ha de portar 'words' com a llista [inici, fi, probabilitat, paraula].
+    Retorna dicts {'start', 'end', 'text', 'prob'} (prob = la mínima del tram).
+    """
+    spans = []
+    current = None
+    for seg in segments:
+        for start, end, prob, word in seg.get('words') or []:
+            if prob < threshold:
+                if current is None:
+                    current = {'start': start, 'end': end, 'words': [word], 'prob': prob}
+                else:
+                    current['end'] = end
+                    current['words'].append(word)
+                    current['prob'] = min(current['prob'], prob)
+                continue
+            if current is not None:
+                spans.append(current)
+                current = None
+        # Un tram no travessa la frontera entre segments
+        if current is not None:
+            spans.append(current)
+            current = None
+    return [
+        {'start': round(s['start'], 2), 'end': round(s['end'], 2),
+         'text': ' '.join(s['words']), 'prob': round(s['prob'], 3)}
+        for s in spans
+    ]
+
+
+def write_spans(note_path, spans: list[dict], threshold: float = LOW_WORD_PROB) -> Path:
+    path = spans_path(note_path)
+    path.write_text(json.dumps({'threshold': threshold, 'spans': spans}, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def read_spans(note_path) -> list[dict] | None:
+    """Trams desats per a la nota, o None si la nota no té índex (transcrita sense probabilitats)."""
+    path = spans_path(note_path)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding='utf-8')).get('spans', [])
+    except (ValueError, AttributeError):
+        return None
+
+
+def rename_spans(old_note_path, new_note_path):
+    old = spans_path(old_note_path)
+    if old.exists():
+        old.rename(spans_path(new_note_path))
+
+
+def locate_spans(transcript: str, spans: list[dict]) -> list[tuple[int, int]]:
+    """Posicions (inici, fi) de cada tram dins la transcripció, cercant en ordre.
+
+    Els trams que ja no hi són (p. ex. substituïts per una correcció memoritzada)
+    s'ometen.
+    """
+    offsets = []
+    cursor = 0
+    for span in spans:
+        words = span['text'].split()
+        if not words:
+            continue
+        pattern = r'\s+'.join(re.escape(w) for w in words)
+        m = re.compile(pattern).search(transcript, cursor)
+        if m is None:
+            continue
+        offsets.append((m.start(), m.end()))
+        cursor = m.end()
+    return offsets
+
+
+def build_excerpts(transcript: str, offsets: list[tuple[int, int]], context_chars: int = CONTEXT_CHARS) -> list[str]:
+    """Fragments amb context al voltant de cada tram; els que se solapen es fusionen."""
+    windows = []
+    for start, end in offsets:
+        lo = max(0, start - context_chars)
+        hi = min(len(transcript), end + context_chars)
+        # Ajustar als límits de paraula
+        if lo > 0:
+            space = transcript.find(' ', lo, start)
+            lo = space + 1 if space != -1 else lo
+        if hi < len(transcript):
+            space = transcript.rfind(' ', end, hi)
+            hi = space if space != -1 else hi
+        if windows and lo <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], hi))
+        else:
+            windows.append((lo, hi))
+    return [transcript[lo:hi].strip() for lo, hi in windows]
@@ -0,0 +1,141 @@
+"""
+Registre compacte de correccions amb posicions al text
+Cada correcció porta les posicions (inici, fi) de totes les aparicions del seu
+original com a paraula sencera, resoltes un sol cop sobre la transcripció ja
+amb els alias aplicats. Amb les posicions, aplicar les correccions és una
+sola passada lineal pel text i l'editor hi pot saltar directament.
+
+CorrectionRecord es comporta com un diccionari de només lectura (c['original'],
+c.get('confiança'), dict(c, status=...)), de manera que la GUI i el codi que
+esperava diccionaris segueixen funcionant.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from transcript_index import TranscriptIndex
+
+KEYS = ('original', 'correccio', 'motiu', 'frase', 'confiança', 'inici', 'fi', 'ocurrencies')
+
+
+@dataclass(slots=True)
+class CorrectionRecord(Mapping):
+    original: str
+    correccio: str
+    motiu: str = ''
+    frase: str = ''
+    confiança: float = 0.0
+    ocurrencies: tuple[tuple[int, int], ...] = ()
+
+    @property
+    def inici(self) -> int | None:
+        return self.ocurrencies[0][0] if self.ocurrencies else None
+
+    @property
+    def fi(self) -> int | None:
+        return self.ocurrencies[0][1] if self.ocurrencies else None
+
+    def __getitem__(self, key):
+        if key not in KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(KEYS)
+
+    def __len__(self):
+        return len(KEYS)
+
+    @classmethod
+    def from_dict(cls, c: Mapping, ocurrencies=()) -> 'CorrectionRecord':
+        return cls(
+            original=c['original'],
+            correccio=c['correccio'],
+            motiu=c.get('motiu', '') or '',
+            frase=c.get('frase', '') or '',
+            confiança=float(c.get('confiança', 0) or 0),
+            ocurrencies=tuple(ocurrencies),
+        )
+
+
+def _usable(corrections) -> list[Mapping]:
+    return [c for c in corrections if isinstance(c, Mapping) and c.get('original') and 'correccio' in c]
+
+
+def _non_overlapping(size: int, candidates) -> list[tuple[int, int, int]]:
+    """(inici, fi, correcció) sense solapaments: guanya la més llarga i, a igual longitud, la primera correcció."""
+    kept = []
+    taken = bytearray(size)
+    for start, end, i in sorted(candidates, key=lambda x: (x[0] - x[1], x[2], x[0])):
+        if any(taken[start:end]):
+            continue
+        taken[start:end] = b'\x01' * (end - start)
+        kept.append((start, end, i))
+    return sorted(kept)
+
+
+def _disjoint(spans) -> list[tuple[int, int]]:
+    """Aparicions d'una sola correcció sense solapaments, d'esquerra a dreta."""
+    kept = []
+    last_end = 0
+    for start, end in sorted(spans, key=lambda x: (x[0], -x[1])):
+        if start >= last_end:
+            kept.append((start, end))
+            last_end = end
+    return kept
+
+
+def find_occurrences(text: str, corrections, index: TranscriptIndex = None) -> list[list[tuple[int, int]]]:
+    """Aparicions com a paraula sencera de l'original de cada correcció.
+
+    No es compten les aparicions que ja formen part del terme correcte
+    (TranscriptIndex.uncovered). Cada correcció es resol per separat: les
+    aparicions de correccions diferents es poden solapar ("Joan" dins de
+    "Joan Pere"), perquè encara no se sap quina s'acceptarà. Es decideix en
+    aplicar-les (apply_corrections), només entre les acceptades.
+    """
+    index = index or TranscriptIndex(text)
+    return [_disjoint(index.uncovered(c['original'], c['correccio'])) for c in corrections]
+
+
+def resolve_offsets(text: str, corrections, index: TranscriptIndex = None) -> list[CorrectionRecord]:
+    """Converteix correccions (diccionaris o registres) en CorrectionRecord amb posicions sobre text."""
+    corrections = _usable(corrections)
+    occurrences = find_occurrences(text, corrections, index)
+    return [CorrectionRecord.from_dict(c, occ) for c, occ in zip(corrections, occurrences)]
+
+
+def _valid(text: str, c: Mapping) -> bool:
+    occ = c.get('ocurrencies')
+    return bool(occ) and all(text[s:e] == c['original'] for s, e in occ)
+
+
+def ensure_offsets(text: str, corrections, index: TranscriptIndex = None) -> list[CorrectionRecord]:
+    """Com resolve_offsets, però conserva les posicions que ja són vàlides per a text."""
+    corrections = _usable(corrections)
+    stale = [c for c in corrections if not _valid(text, c)]
+    resolved = iter(resolve_offsets(text, stale, index) if stale else [])
+    return [
+        next(resolved) if not _valid(text, c)
+        else c if isinstance(c, CorrectionRecord) else CorrectionRecord.from_dict(c, c['ocurrencies'])
+        for c in corrections
+    ]
+
+
+def apply_corrections(text: str, corrections) -> str:
+    """Reconstrueix el text amb les correccions aplicades en una sola passada.
+
+    Les posicions que no corresponen a aquest text (o que falten) es tornen a
+    resoldre. Si aparicions de dues correccions se solapen, guanya la més
+    llarga i, a igual longitud, la primera de la llista.
+    """
+    records = ensure_offsets(text, corrections)
+    edits = _non_overlapping(len(text), ((s, e, i) for i, c in enumerate(records) for s, e in c['ocurrencies']))
+    parts = []
+    pos = 0
+    for start, end, i in edits:
+        parts.append(text[pos:start])
+        parts.append(records[i]['correccio'])
+        pos = end
+    parts.append(text[pos:])
+    return ''.join(parts)
@@ -1,7 +1,8 @@
-import os
 import re
 from pydantic import BaseModel
-from crewai import Agent, Task, Crew, LLM
+
+from llm_completion import CompletionLLM, Role
+from vocabulary_selector import VocabularySelector
 
 
 class PersonDaily(BaseModel):
@@ -15,13 +16,21 @@ class DailyScrumResult(BaseModel):
     altres_temes: list[str]
 
 
+DAILY_ROLE = Role(
+    role="Analista de Daily Scrum",
+    goal="Extreure el resum per persona d'una reunió de Daily Scrum",
+    backstory="Expert en anàlisi de reunions Daily Scrum en català per equips tecnològics.",
+)
+
+
 class DailyProcessor:
-    def __init__(self, vocab: dict, model: str = None):
+    def __init__(self, vocab: dict, model: str = None, semantic_memory_path=None, vocab_budget: int = None):
         self.vocab = vocab
-        self.llm = LLM(model=model or os.getenv('LLM_MODELH'), drop_params=True)
+        self.vocab_selector = VocabularySelector(vocab, semantic_memory_path, token_budget=vocab_budget)
+        self.llm = CompletionLLM(model)
 
     def process(self, transcript: str, attendees: list[dict]) -> DailyScrumResult:
-        vocab_text = self._format_vocab()
+        vocab_text = self._format_vocab(transcript)
         attendees_filtered = [
             a for a in attendees
             if a.get('name') != 'Jordi Beringues'
@@ -29,16 +38,7 @@ class DailyProcessor:
         ]
         attendees_list = '\n'.join(f'- {a["name"]}' for a in attendees_filtered)
 
-        agent = Agent(
-            role="Analista de Daily Scrum",
-            goal="Extreure el resum per persona d'una reunió de Daily Scrum",
-            backstory="Expert en anàlisi de reunions Daily Scrum en català per equips tecnològics.",
-            llm=self.llm,
-            verbose=False
-        )
-
-        task = Task(
-            description=f"""
+        prompt = f"""
 Analitza la transcripció d'una reunió de Daily Scrum (sincronització diària).
 
 ASSISTENTS (noms exactes que has d'usar):
@@ -61,17 +61,12 @@ INSTRUCCIONS:
 - No inventis informació que no aparegui a la transcripció.
 - Si es discuteixen temes addicionals (decisions, blockers, discussions generals), afegeix-los a "altres_temes" com a frases curtes.
 - Si no hi ha temes addicionals, deixa "altres_temes" buit.
-""",
-            expected_output="DailyScrumResult amb participants i altres_temes",
-            agent=agent,
-            output_pydantic=DailyScrumResult
-        )
+"""
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
         print("  → Agent Daily Scrum iniciat...")
-        result = crew.kickoff()
+        result = self.llm.complete_model(prompt, DailyScrumResult, role=DAILY_ROLE, label='DailyProcessor')
         print("  ✓ Agent Daily Scrum finalitzat\n")
-        return result.pydantic
+        return result
 
     def format_markdown(self, result: DailyScrumResult, meeting_title: str, date_str: str) -> str:
         lines = [f"# {meeting_title} - {date_str}", ""]
@@ -98,8 +93,5 @@ INSTRUCCIONS:
 
         return '\n'.join(lines)
 
-    def _format_vocab(self) -> str:
-        lines = []
-        for seccio, paraules in self.vocab.items():
-            lines.append(f"{seccio}: {', '.join(paraules)}")
-        return '\n'.join(lines)
+    def _format_vocab(self, transcript: str) -> str:
+        return self.vocab_selector.format(transcript)
@@ -10,15 +10,6 @@ from dotenv import load_dotenv
 
 litellm.drop_params = True
 
-# Patch CrewAI LLM per eliminar el paràmetre 'stop' que alguns models no suporten
-from crewai import LLM as CrewLLM
-_orig_prepare = CrewLLM._prepare_completion_params
-def _patched_prepare(self, messages, tools=None):
-    params = _orig_prepare(self, messages, tools)
-    params.pop('stop', None)
-    return params
-CrewLLM._prepare_completion_params = _patched_prepare
-
 # Carregar .env des de l'arrel del projecte (2 nivells amunt de src/gui/)
 _project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(_project_root, '.env'))
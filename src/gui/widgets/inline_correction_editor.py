@@ -5,6 +5,18 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QTextCharFormat, QColor, QFont, QTextCursor, QFontDatabase
 from PySide6.QtCore import Qt, QTimer
 
+from correction_record import ensure_offsets
+
+
+def _doc_positions(text: str):
+    """Posicions de Python (punts de codi) → posicions de QTextDocument (unitats UTF-16)."""
+    if text.isascii() or max(text) <= '\uffff':
+        return lambda i: i
+    prefix = [0]
+    for ch in text:
+        prefix.append(prefix[-1] + (2 if ord(ch) > 0xFFFF else 1))
+    return prefix.__getitem__
+
 
 class InlineCorrectionEditor(QWidget):
     """Editor de text amb correccions resaltades inline.
@@ -21,6 +33,14 @@ class InlineCorrectionEditor(QWidget):
       manual    : l'usuari ha editat el text i l'original ja no existeix
       not_found : l'original no s'ha trobat en intentar aplicar la correcció
 
+    Cada correcció porta les posicions (spans) de les seves aparicions al
+    document, calculades a partir de les posicions resoltes pel corrector. Es
+    mantenen al dia amb cada edició (contentsChange), de manera que acceptar,
+    rebutjar, ressaltar i saltar a una correcció no ha de buscar el text.
+    Les aparicions de dues correccions es poden solapar ("Joan" dins de
+    "Joan Pere"): si es rebutja la llarga, la curta segueix ressaltada i es pot
+    acceptar; si s'accepta la llarga, la curta ja no hi és i passa a 'manual'.
+
     Colors:
       Actual    : taronja  #FF9800
       Pendent   : groc     #FFE082
@@ -36,8 +56,14 @@ class InlineCorrectionEditor(QWidget):
     def __init__(self, transcript: str, corrections: list[dict], parent=None,
                  threshold_auto: float = 1.1):
         super().__init__(parent)
-        self._corrections = [dict(c, status='pending', memorize=False) for c in corrections]
+        to_doc = _doc_positions(transcript)
+        self._corrections = [
+            dict(c, status='pending', memorize=False,
+                 spans=[[to_doc(start), to_doc(end)] for start, end in c['ocurrencies']])
+            for c in ensure_offsets(transcript, corrections)
+        ]
         self._memorized: list[dict] = []
+        self._auto_accepted: list[dict] = []
         self._current = 0 if corrections else -1
 
         layout = QVBoxLayout(self)
@@ -50,6 +76,7 @@ class InlineCorrectionEditor(QWidget):
         self.editor = QTextEdit()
         self.editor.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
         self.editor.setPlainText(transcript)
+        self.editor.document().contentsChange.connect(self._on_contents_change)
         layout.addWidget(self.editor)
 
         self._timer = QTimer(self)
@@ -68,6 +95,38 @@ class InlineCorrectionEditor(QWidget):
             self.editor.textChanged.connect(lambda: self._timer.start())
             self._refresh()
 
+    # ── Posicions ────────────────────────────────────────────────────────────
+
+    def _on_contents_change(self, pos: int, removed: int, added: int):
+        """Desplaça les posicions de les correccions després d'una edició (de l'usuari o nostra)."""
+        end = pos + removed
+        delta = added - removed
+        for c in self._corrections:
+            for span in c['spans']:
+                start, stop = span
+                if (start < end and pos < stop) or start == stop == pos:
+                    # L'edició toca l'aparició: passa a cobrir també el text nou
+                    span[0], span[1] = min(start, pos), max(stop, end) + delta
+                elif start >= end:
+                    span[0], span[1] = start + delta, stop + delta
+
+    def _span_cursor(self, span) -> QTextCursor:
+        cursor = QTextCursor(self.editor.document())
+        cursor.setPosition(span[0])
+        cursor.setPosition(span[1], QTextCursor.MoveMode.KeepAnchor)
+        return cursor
+
+    def _spans_with(self, c: dict, text: str) -> list:
+        return [span for span in c['spans'] if self._span_cursor(span).selectedText() == text]
+
+    def _replace(self, c: dict, old: str, new: str) -> bool:
+        """Substitueix old per new a totes les aparicions de la correcció; False si no n'hi ha cap."""
+        spans = self._spans_with(c, old)
+        # De darrere cap endavant: cada substitució no mou les posicions pendents
+        for span in sorted(spans, reverse=True):
+            self._span_cursor(span).insertText(new)
+        return bool(spans)
+
     # ── Auto-acceptació ──────────────────────────────────────────────────────
 
     def _auto_accept_high_confidence(self, threshold: float):
@@ -75,9 +134,8 @@ class InlineCorrectionEditor(QWidget):
         remaining = []
         for c in self._corrections:
             if c.get('confiança', 0) >= threshold:
-                cursor = self.editor.document().find(c['original'])
-                if not cursor.isNull():
-                    cursor.insertText(c['correccio'])
+                self._replace(c, c['original'], c['correccio'])
+                self._auto_accepted.append(c)
                 # no s'afegeix a remaining: desapareix de la llista
             else:
                 remaining.append(c)
@@ -174,18 +232,12 @@ class InlineCorrectionEditor(QWidget):
             return
 
         if c['status'] == 'rejected':
-            # Desfer rebuig: cercar original i substituir per correcció
-            cursor = self.editor.document().find(c['original'])
-            if not cursor.isNull():
-                cursor.insertText(c['correccio'])
-        else:  # pending / not_found
-            cursor = self.editor.document().find(c['original'])
-            if not cursor.isNull():
-                cursor.insertText(c['correccio'])
-            else:
-                c['status'] = 'not_found'
-                self._refresh()
-                return
+            # Desfer rebuig: substituir l'original per la correcció
+            self._replace(c, c['original'], c['correccio'])
+        elif not self._replace(c, c['original'], c['correccio']):  # pending / not_found
+            c['status'] = 'not_found'
+            self._refresh()
+            return
 
         c['status'] = 'accepted'
 
@@ -208,10 +260,8 @@ class InlineCorrectionEditor(QWidget):
             return
 
         if c['status'] == 'accepted':
-            # Desfer acceptació: cercar correcció i restaurar original
-            cursor = self.editor.document().find(c['correccio'])
-            if not cursor.isNull():
-                cursor.insertText(c['original'])
+            # Desfer acceptació: restaurar l'original
+            self._replace(c, c['correccio'], c['original'])
 
         c['status'] = 'rejected'
         c['memorize'] = False
@@ -320,12 +370,10 @@ class InlineCorrectionEditor(QWidget):
         self.btn_next.setEnabled(self._current < n - 1)
 
     def _update_highlights(self):
-        doc = self.editor.document()
-
         # Pas 1: detectar correccions pendents que l'usuari ha editat manualment
         nav_needs_update = False
         for i, c in enumerate(self._corrections):
-            if c['status'] == 'pending' and doc.find(c['original']).isNull():
+            if c['status'] == 'pending' and not self._spans_with(c, c['original']):
                 c['status'] = 'manual'
                 if i == self._current:
                     nav_needs_update = True
@@ -333,30 +381,23 @@ class InlineCorrectionEditor(QWidget):
         if nav_needs_update:
             self._update_nav_info()
 
-        # Pas 2: dibuixar highlights
-        #   pending   → cerca 'original'  (groc / taronja si és actual)
-        #   accepted  → cerca 'correccio' (verd  / taronja si és actual)
-        #   rejected  → cerca 'original'  (gris  / taronja si és actual)
-        #   manual / not_found → sense highlight
+        # Pas 2: dibuixar highlights sobre les posicions de cada correcció
+        #   pending   → 'original'  (groc / taronja si és actual)
+        #   accepted  → 'correccio' (verd  / taronja si és actual)
+        #   rejected  → 'original'  (gris  / taronja si és actual)
+        #   manual    → el que hi hagi escrit l'usuari
+        #   not_found → sense highlight
         selections = []
         for i, c in enumerate(self._corrections):
             status = c['status']
             is_current = (i == self._current)
 
             if status == 'pending':
-                search_text = c['original']
                 color = self._COL_CURRENT if is_current else self._COL_PENDING
-            elif status == 'accepted':
-                search_text = c['correccio']
+            elif status in ('accepted', 'manual'):
                 color = self._COL_CURRENT if is_current else self._COL_ACCEPTED
             elif status == 'rejected':
-                search_text = c['original']
                 color = self._COL_CURRENT if is_current else self._COL_REJECTED
-            elif status == 'manual':
-                # Intentem trobar la correcció suggerida; si l'usuari ha escrit
-                # una altra cosa no podem saber on és, i no es ressaltarà res.
-                search_text = c['correccio']
-                color = self._COL_CURRENT if is_current else self._COL_ACCEPTED
             else:
                 continue  # not_found
 
@@ -366,13 +407,13 @@ class InlineCorrectionEditor(QWidget):
             if is_current:
                 fmt.setFontWeight(700)
 
-            cursor = doc.find(search_text)
-            while not cursor.isNull():
+            for span in c['spans']:
+                if span[0] == span[1]:
+                    continue
                 sel = QTextEdit.ExtraSelection()
                 sel.format = fmt
-                sel.cursor = cursor
+                sel.cursor = self._span_cursor(span)
                 selections.append(sel)
-                cursor = doc.find(search_text, cursor)
 
         self.editor.setExtraSelections(selections)
 
@@ -380,20 +421,11 @@ class InlineCorrectionEditor(QWidget):
         if self._current < 0:
             return
         c = self._corrections[self._current]
-
-        if c['status'] in ('accepted', 'manual'):
-            search_text = c['correccio']
-        elif c['status'] in ('pending', 'rejected'):
-            search_text = c['original']
-        else:
-            return  # not_found: no podem fer scroll
-
-        found = self.editor.document().find(search_text)
-        if found.isNull():
+        if c['status'] == 'not_found' or not c['spans']:
             return
         # Cursor sense selecció per no sobreposar al highlight
         cursor = QTextCursor(self.editor.document())
-        cursor.setPosition(found.anchor())
+        cursor.setPosition(min(span[0] for span in c['spans']))
         self.editor.setTextCursor(cursor)
         self.editor.ensureCursorVisible()
 
@@ -402,6 +434,10 @@ class InlineCorrectionEditor(QWidget):
     def get_final_text(self) -> str:
         return self.editor.toPlainText()
 
+    def get_accepted_list(self) -> list[dict]:
+        """Correccions que queden aplicades al text (incloses les acceptades automàticament)."""
+        return self._auto_accepted + [c for c in self._corrections if c['status'] == 'accepted']
+
     def get_memorize_list(self) -> list[dict]:
         # Afegir correccions manuals pendents de desar que tenen memorize=True
         result = list(self._memorized)
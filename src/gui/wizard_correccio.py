@@ -7,6 +7,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from vocabulary_loader import VocabularyLoader
 from transcript_corrector import TranscriptCorrector
+from confidence_spans import read_spans
+from vocabulary_selector import record_usage
 from workers import BatchCorrectionDetectWorker
 from widgets.inline_correction_editor import InlineCorrectionEditor
 
@@ -152,6 +154,8 @@ class WizardCorreccio(QDialog):
         vocab = loader.load()
         config = loader.load_config()
         threshold_auto = float(config.get('threshold_auto', '0.85'))
+        phonetic_mode = config.get('mode_fonetic') or None   # offline | prefiltre
+        max_in_flight = int(config.get('max_paralel', BatchCorrectionDetectWorker.MAX_IN_FLIGHT))
 
         self.batch_results.clear()
         tasks = []
@@ -169,7 +173,8 @@ class WizardCorreccio(QDialog):
                 meeting_dir = note['path'].parent.parent
                 semantic_memory_path = meeting_dir / 'semantic_memory.json'
                 corrector = TranscriptCorrector(vocab, semantic_memory_path=semantic_memory_path,
-                                               threshold_auto=threshold_auto)
+                                               threshold_auto=threshold_auto,
+                                               phonetic_mode=phonetic_mode)
                 transcript = self.obsidian.read_transcript(note['path'])
 
                 reference_transcript = None
@@ -201,6 +206,7 @@ class WizardCorreccio(QDialog):
                     'transcript': transcript,
                     'reference_transcript': reference_transcript,
                     'semantic_context': semantic_context,
+                    'spans': read_spans(note['path']),
                 })
             except Exception as e:
                 import traceback
@@ -212,8 +218,9 @@ class WizardCorreccio(QDialog):
 
         self.lbl_batch_status.setText(f"Processant 0/{len(selected_notes)}...")
 
-        self.batch_worker = BatchCorrectionDetectWorker(tasks, self)
+        self.batch_worker = BatchCorrectionDetectWorker(tasks, self, max_in_flight=max_in_flight)
         self.batch_worker.note_started.connect(self._on_note_started)
+        self.batch_worker.correction_found.connect(self._on_correction_found)
         self.batch_worker.note_finished.connect(self._on_note_finished)
         self.batch_worker.note_error.connect(self._on_note_error)
         self.batch_worker.all_finished.connect(self._on_batch_finished)
@@ -223,6 +230,14 @@ class WizardCorreccio(QDialog):
         self.batch_results[idx].status = 'detecting'
         self.table_batch.setItem(idx, 2, QTableWidgetItem("Processant..."))
 
+    def _on_correction_found(self, idx, correction):
+        # Recompte provisional mentre el LLM genera; note_finished porta la llista definitiva
+        result = self.batch_results[idx]
+        if result.status != 'detecting':
+            return
+        result.corrections.append(correction)
+        self.table_batch.setItem(idx, 3, QTableWidgetItem(f"{len(result.corrections)}…"))
+
     def _on_note_finished(self, idx, transcript, corrections):
         result = self.batch_results[idx]
         result.transcript = transcript
@@ -346,6 +361,8 @@ class WizardCorreccio(QDialog):
         mem_list = self.inline_editor.get_memorize_list()
         if mem_list and result.meeting_dir:
             self._save_aliases_to_semantic_memory(result.meeting_dir, mem_list)
+        # Només les correccions acceptades o memoritzades compten com a ús recent del vocabulari
+        record_usage(c['correccio'] for c in self.inline_editor.get_accepted_list() + mem_list)
 
         self.obsidian.update_transcript(result.note['path'], corrected)
         self.obsidian.mark_as_corrected(result.note['path'])
@@ -230,7 +230,8 @@ class WizardProcessar(QDialog):
                 seen_names.add(speaker)
 
         from daily_processor import DailyProcessor
-        processor = DailyProcessor(vocab)
+        meeting_dir = note['path'].parent.parent
+        processor = DailyProcessor(vocab, semantic_memory_path=meeting_dir / 'semantic_memory.json')
         date_obj = datetime.strptime(note['date'], '%y%m%d')
         date_str = date_obj.strftime('%d/%m/%Y')
 
@@ -3,10 +3,10 @@ from pathlib import Path
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QStackedWidget, QWidget,
     QPushButton, QTableWidget, QTableWidgetItem, QTreeWidget, QTreeWidgetItem,
-    QLabel, QProgressBar, QMessageBox, QHeaderView, QDateEdit
+    QLabel, QProgressBar, QMessageBox, QHeaderView, QDateEdit, QFileDialog
 )
 from PySide6.QtCore import Qt, QDate
-from workers import CalendarWorker
+from workers import CalendarWorker, TranscriptionWorker
 from widgets.transcript_editor import TranscriptEditor
 
 
@@ -21,6 +21,7 @@ class WizardTranscripcio(QDialog):
         self.reunions = []
         self.selected_reunio = None
         self.selected_target_dir: Path | None = None
+        self.worker_transcription: TranscriptionWorker | None = None
 
         layout = QVBoxLayout(self)
 
@@ -171,8 +172,88 @@ class WizardTranscripcio(QDialog):
         self.transcript_editor.editor.textChanged.connect(self._update_nav)
         page.addWidget(self.transcript_editor)
 
+        # Alternativa: transcriure un àudio directament a la nota
+        audio_row = QHBoxLayout()
+        self.btn_audio = QPushButton("Transcriure àudio...")
+        self.btn_audio.clicked.connect(self._transcribe_audio)
+        audio_row.addWidget(self.btn_audio)
+        self.progress_audio = QProgressBar()
+        self.progress_audio.setRange(0, 1000)
+        self.progress_audio.setVisible(False)
+        audio_row.addWidget(self.progress_audio)
+        page.addLayout(audio_row)
+
+        self.lbl_audio = QLabel()
+        self.lbl_audio.setStyleSheet("color: #666; font-style: italic;")
+        self.lbl_audio.setWordWrap(True)
+        page.addWidget(self.lbl_audio)
+
         self.stack.addWidget(container)
 
+    def _transcribe_audio(self):
+        audio_path, _ = QFileDialog.getOpenFileName(
+            self, "Selecciona l'àudio", "", "Àudio (*.mp3 *.m4a *.wav *.ogg *.flac)"
+        )
+        if not audio_path:
+            return
+
+        note_path = self.obsidian.simple_note_path(self.selected_reunio, self.selected_target_dir)
+        if note_path.exists():
+            ret = QMessageBox.question(
+                self, "Nota existent",
+                f"{note_path.name} ja existeix. Vols sobreescriure-la?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if ret != QMessageBox.StandardButton.Yes:
+                return
+
+        # Nota amb la secció de transcripció buida; els segments s'hi afegeixen en streaming
+        if not self.obsidian.create_simple_note(self.selected_reunio, '', self.selected_target_dir):
+            QMessageBox.critical(self, "Error", "Error creant la nota.")
+            return
+
+        self._set_transcribing(True)
+        self.lbl_audio.setText("Carregant model...")
+        # La nota passa després per l'assistent de correcció, que llegeix els trams de baixa confiança
+        self.worker_transcription = TranscriptionWorker(self.obsidian, audio_path, note_path,
+                                                        word_probs=True, parent=self)
+        self.worker_transcription.progress.connect(self._on_audio_progress)
+        self.worker_transcription.finished.connect(self._on_audio_finished)
+        self.worker_transcription.error.connect(self._on_audio_error)
+        self.worker_transcription.start()
+
+    def _on_audio_progress(self, end, duration, text):
+        if duration:
+            self.progress_audio.setValue(int(1000 * min(end / duration, 1.0)))
+        self.lbl_audio.setText(f"{self._fmt_time(end)} / {self._fmt_time(duration)} — {text}")
+
+    def _on_audio_finished(self, count):
+        self._set_transcribing(False)
+        QMessageBox.information(self, "Transcripció", f"Transcripció desada a la nota ({count} segments).")
+        self._reset()
+
+    def _on_audio_error(self, msg):
+        self._set_transcribing(False)
+        QMessageBox.critical(self, "Error", f"Error transcrivint l'àudio:\n{msg}")
+
+    def _set_transcribing(self, running: bool):
+        self.progress_audio.setVisible(running)
+        self.progress_audio.setValue(0)
+        self.btn_audio.setEnabled(not running)
+        self.transcript_editor.setEnabled(not running)
+        self.btn_back.setEnabled(not running)
+        self.btn_cancel.setEnabled(not running)
+        if running:
+            self.btn_next.setEnabled(False)
+        else:
+            self.lbl_audio.clear()
+            self._update_nav()
+
+    @staticmethod
+    def _fmt_time(seconds: float) -> str:
+        seconds = int(seconds)
+        return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
     # -- Navegació --
 
     def _make_page(self, layout):
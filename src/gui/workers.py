@@ -1,5 +1,5 @@
 import os
-import litellm
+from llm_cache import cached_completion
 from datetime import datetime, timedelta
 from PySide6.QtCore import QThread, Signal
 
@@ -35,23 +35,27 @@ class CalendarWorker(QThread):
 
 
 class CorrectionDetectWorker(QThread):
+    correction_found = Signal(dict)   # cada correcció tan bon punt el LLM l'ha generat
     finished = Signal(str, list)
     error = Signal(str)
 
     def __init__(self, corrector, transcript, reference_transcript=None,
-                 semantic_context=None, parent=None):
+                 semantic_context=None, spans=None, parent=None):
         super().__init__(parent)
         self.corrector = corrector
         self.transcript = transcript
         self.reference_transcript = reference_transcript
         self.semantic_context = semantic_context
+        self.spans = spans
 
     def run(self):
         try:
             transcript, corrections = self.corrector.detect(
                 self.transcript,
                 reference_transcript=self.reference_transcript,
-                semantic_context=self.semantic_context
+                semantic_context=self.semantic_context,
+                spans=self.spans,
+                on_correction=self.correction_found.emit
             )
             self.finished.emit(transcript, corrections)
         except Exception as e:
@@ -59,38 +63,110 @@ class CorrectionDetectWorker(QThread):
 
 
 class BatchCorrectionDetectWorker(QThread):
+    """Detecta correccions de diverses notes en paral·lel.
+
+    Com a màxim max_in_flight notes alhora; les crides al LLM de totes les notes
+    i finestres comparteixen un sol límit (transcript_corrector) i el ritme el
+    limita rate_limiter (LLM_RPM / LLM_TPM). Els senyals surten per nota a mesura que
+    acaben, de manera que la taula s'omple en qualsevol ordre.
+    """
     note_started = Signal(int)
+    correction_found = Signal(int, dict)   # (nota, correcció) mentre el LLM encara genera
     note_finished = Signal(int, str, list)
     note_error = Signal(int, str)
     all_finished = Signal()
 
-    def __init__(self, tasks: list, parent=None):
+    MAX_IN_FLIGHT = 3
+
+    def __init__(self, tasks: list, parent=None, max_in_flight: int = MAX_IN_FLIGHT):
         super().__init__(parent)
         self.tasks = tasks
+        self.max_in_flight = max(1, max_in_flight)
         self._abort = False
 
     def abort(self):
         self._abort = True
 
+    def _detect(self, task):
+        if self._abort:
+            return
+        self.note_started.emit(task['index'])
+        try:
+            transcript, corrections = task['corrector'].detect(
+                task['transcript'],
+                reference_transcript=task['reference_transcript'],
+                semantic_context=task['semantic_context'],
+                spans=task.get('spans'),
+                on_correction=lambda c: self.correction_found.emit(task['index'], c)
+            )
+            self.note_finished.emit(task['index'], transcript, corrections)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.note_error.emit(task['index'], str(e))
+
     def run(self):
-        import traceback
-        for task in self.tasks:
-            if self._abort:
-                break
-            self.note_started.emit(task['index'])
-            try:
-                transcript, corrections = task['corrector'].detect(
-                    task['transcript'],
-                    reference_transcript=task['reference_transcript'],
-                    semantic_context=task['semantic_context']
-                )
-                self.note_finished.emit(task['index'], transcript, corrections)
-            except Exception as e:
-                traceback.print_exc()
-                self.note_error.emit(task['index'], str(e))
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            list(pool.map(self._detect, self.tasks))
         self.all_finished.emit()
 
 
+class TranscriptionWorker(QThread):
+    """Transcriu un àudio i n'escriu els segments a la nota a mesura que surten.
+
+    Amb word_probs=True també desa l'índex de trams de baixa confiança
+    (confidence_spans) que fa servir la correcció; costa temps de descodificació.
+    """
+    progress = Signal(float, float, str)   # fi del segment (s), durada total (s), text
+    finished = Signal(int)
+    error = Signal(str)
+
+    _model = None   # model compartit entre execucions: només es carrega un cop per sessió
+
+    def __init__(self, obsidian, audio_path, note_path, use_prompt=True, word_probs=False, parent=None):
+        super().__init__(parent)
+        self.obsidian = obsidian
+        self.audio_path = audio_path
+        self.note_path = note_path
+        self.use_prompt = use_prompt
+        self.word_probs = word_probs
+
+    def run(self):
+        try:
+            import transcribe_test_2 as tt
+            if TranscriptionWorker._model is None:
+                TranscriptionWorker._model, _ = tt.load_model()
+            prompt = hotwords = None
+            if self.use_prompt:
+                prompt, hotwords = tt.build_prompt(
+                    self.obsidian.vault / 'Reunions' / 'zConfig' / 'Vocabulari.md',
+                    self.note_path.parent.parent
+                )
+            segments, info = tt.iter_segments(
+                str(self.audio_path), use_prompt=self.use_prompt, model=TranscriptionWorker._model,
+                prompt=prompt, hotwords=hotwords, word_probs=self.word_probs
+            )
+            from segment_sidecar import SegmentSidecarWriter
+            from confidence_spans import extract_spans, write_spans
+            count = 0
+            spans = []
+            with SegmentSidecarWriter(self.note_path, {'audio': os.path.basename(self.audio_path),
+                                                       'model': tt.MODEL_ID}) as sidecar:
+                for seg in segments:
+                    self.obsidian.append_transcript_segment(self.note_path, seg['text'])
+                    sidecar.append(seg)
+                    if self.word_probs:
+                        spans.extend(extract_spans([seg]))
+                    count += 1
+                    self.progress.emit(seg['end'], info.duration, seg['text'])
+            if self.word_probs:
+                write_spans(self.note_path, spans)
+            self.finished.emit(count)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 class DailyProcessorWorker(QThread):
     finished = Signal(object, str)
     error = Signal(str)
@@ -170,20 +246,15 @@ class ProjectInitWorker(QThread):
             if docs_text:
                 context += f"\n\nDocumentació del projecte:\n{docs_text}"
 
-            response = litellm.completion(
-                model=os.getenv('LLM_MODELH'),
-                messages=[{
-                    "role": "user",
-                    "content": (
-                        f"Analitza la informació següent sobre el projecte «{self.project_name}» "
-                        f"i genera un resum en català de 4-5 línies.\n"
-                        f"Descriu què és el projecte, els objectius principals i el context clau. "
-                        f"Resposta directa, sense introduccions ni conclusions.\n\n"
-                        f"{context}"
-                    )
-                }]
+            summary = cached_completion(
+                f"Analitza la informació següent sobre el projecte «{self.project_name}» "
+                f"i genera un resum en català de 4-5 línies.\n"
+                f"Descriu què és el projecte, els objectius principals i el context clau. "
+                f"Resposta directa, sense introduccions ni conclusions.\n\n"
+                f"{context}",
+                kind='resum_projecte'
             )
-            self.finished.emit(response.choices[0].message.content.strip())
+            self.finished.emit(summary)
         except Exception as e:
             self.error.emit(str(e))
 
@@ -198,22 +269,16 @@ class SummaryWorker(QThread):
 
     def run(self):
         try:
-            response = litellm.completion(
-                model=os.getenv('LLM_MODELH'),
-                messages=[{
-                    "role": "user",
-                    "content": (
-                        "Analitza el text següent i fes un resum estructurat en català.\n"
-                        "Per cada tema diferent que s'hagi tractat:\n"
-                        "1. Posa un titular amb el format exacte: ##### Nom del tema\n"
-                        "2. Sota el titular, afegeix un resum de màxim 3 bullets (-) amb els punts més importants.\n"
-                        "Detecta els temes de forma natural a partir del contingut.\n"
-                        "Sense introducció ni conclusió. Sense línies buides entre temes.\n\n"
-                        f"{self.transcript}"
-                    )
-                }]
+            summary = cached_completion(
+                "Analitza el text següent i fes un resum estructurat en català.\n"
+                "Per cada tema diferent que s'hagi tractat:\n"
+                "1. Posa un titular amb el format exacte: ##### Nom del tema\n"
+                "2. Sota el titular, afegeix un resum de màxim 3 bullets (-) amb els punts més importants.\n"
+                "Detecta els temes de forma natural a partir del contingut.\n"
+                "Sense introducció ni conclusió. Sense línies buides entre temes.\n\n"
+                f"{self.transcript}",
+                kind='resum'
             )
-            summary = response.choices[0].message.content.strip()
             self.finished.emit(summary)
         except Exception as e:
             self.error.emit(str(e))
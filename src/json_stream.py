@@ -0,0 +1,72 @@
+"""
+Lectura incremental d'objectes JSON d'una resposta en streaming
+El LLM retorna una llista d'objectes, sola ([{...}, {...}]) o dins d'un objecte
+({"correccions": [{...}, ...]}). JSONArrayStream rep els fragments de text a
+mesura que arriben i retorna cada objecte que és element d'una llista tan bon
+punt es tanca la seva clau final, sense esperar la resta de la resposta.
+
+Es tenen en compte les cometes i els escapaments dins de les cadenes, de manera
+que un '}' o un ']' dins d'un text no es confon amb el final d'un objecte.
+"""
+
+import json
+
+from json_repair import repair_json
+
+
+class JSONArrayStream:
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._stack: list[str] = []        # contenidors oberts: '{' o '['
+        self._in_string = False
+        self._escape = False
+        self._item_start: int | None = None
+        self._item_depth = 0
+        self.invalid: list[str] = []       # objectes tancats que no s'han pogut llegir
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Afegeix text i retorna els objectes d'una llista que s'han completat."""
+        self.text += chunk
+        items = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if ch == '{' and self._item_start is None and self._stack and self._stack[-1] == '[':
+                    self._item_start = i
+                    self._item_depth = len(self._stack) + 1
+                self._stack.append(ch)
+            elif ch in '}]' and self._stack:
+                self._stack.pop()
+                if ch == '}' and self._item_start is not None and len(self._stack) + 1 == self._item_depth:
+                    item = self._parse(text[self._item_start:i + 1])
+                    if item is not None:
+                        items.append(item)
+                    self._item_start = None
+        self._pos = len(text)
+        return items
+
+    def _parse(self, raw: str) -> dict | None:
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            item = repair_json(raw, return_objects=True)
+        if isinstance(item, dict) and item:
+            return item
+        self.invalid.append(raw)
+        return None
+
+    def complete(self) -> bool:
+        """Cert si s'han tancat tots els contenidors oberts."""
+        return not self._stack and self._pos > 0
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la capa de crides al LLM: CrewAI (Agent/Task/Crew) vs llm_completion
+Envia el mateix prompt de detecció de correccions pels dos camins i mesura, per
+crida, el temps de construcció, la latència total i els tokens d'entrada i
+sortida que reporta el proveïdor. També mesura el temps d'importació de cada
+camí en un procés nou. La memòria cau de respostes es desactiva.
+CrewAI ja no és dependència del projecte: cal instal·lar-lo a part (pip install crewai).
+
+Ús:
+    python src/llm_benchmark.py nota1.md nota2.md --vocab Vocabulari.md --repeticions 3
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+from dotenv import load_dotenv
+from json_repair import repair_json
+
+from llm_completion import CompletionLLM
+from obsidian_writer import ObsidianWriter
+from transcript_corrector import TranscriptCorrector, CORRECTOR_ROLE, WINDOW_CHARS
+from vocabulary_loader import VocabularyLoader
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / 'data' / 'benchmarks'
+MODES = ['crew', 'directe']
+
+
+def import_time(module: str) -> float:
+    """Segons que triga a importar module en un intèrpret nou."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=Path(__file__).resolve().parent)
+    return float(out.stdout.strip()) if out.returncode == 0 else float('nan')
+
+
+def _count(raw: str) -> int:
+    corrections = repair_json(raw, return_objects=True) or []
+    if isinstance(corrections, dict):
+        corrections = corrections.get('correccions', [])
+    return len(corrections) if isinstance(corrections, list) else 0
+
+
+def _crew_call(model: str, prompt: str) -> dict:
+    """El camí anterior: un Agent, una Task i una Crew nous per crida."""
+    from crewai import Agent, Task, Crew, LLM
+
+    t0 = time.perf_counter()
+    llm = LLM(model=model, drop_params=True)
+    agent = Agent(role=CORRECTOR_ROLE.role, goal=CORRECTOR_ROLE.goal, backstory=CORRECTOR_ROLE.backstory,
+                  llm=llm, verbose=False)
+    task = Task(description=prompt, expected_output="Objecte JSON {\"correccions\": [...]} amb camp 'confiança'",
+                agent=agent)
+    crew = Crew(agents=[agent], tasks=[task], verbose=False)
+    build = time.perf_counter() - t0
+    result = crew.kickoff()
+    usage = getattr(result, 'token_usage', None)
+    return {
+        'build_s': build,
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        'corrections': _count(result.raw if hasattr(result, 'raw') else str(result)),
+    }
+
+
+def _direct_call(model: str, prompt: str) -> dict:
+    t0 = time.perf_counter()
+    llm = CompletionLLM(model)
+    build = time.perf_counter() - t0
+    raw = llm.complete(prompt, role=CORRECTOR_ROLE, label='benchmark', kind='benchmark')
+    return {
+        'build_s': build,
+        'prompt_tokens': llm.usage['prompt_tokens'],
+        'completion_tokens': llm.usage['completion_tokens'],
+        'corrections': _count(raw),
+    }
+
+
+def _patch_crewai_stop():
+    # El camí de CrewAI encara necessita treure el paràmetre 'stop' per a alguns models
+    from crewai import LLM as CrewLLM
+    orig = CrewLLM._prepare_completion_params
+
+    def _patched(self, messages, tools=None):
+        params = orig(self, messages, tools)
+        params.pop('stop', None)
+        return params
+    CrewLLM._prepare_completion_params = _patched
+
+
+def run_benchmark(notes: list[Path], vocab: dict, model: str, repetitions: int) -> list[dict]:
+    calls = {'crew': _crew_call, 'directe': _direct_call}
+    corrector = TranscriptCorrector(vocab, model=model, window_chars=0)
+    vocab_text = corrector._format_vocab()
+    rows = []
+    for path in notes:
+        transcript = ObsidianWriter(path.parent).read_transcript(path)
+        # Una sola crida per nota: les transcripcions llargues es retallen a una finestra
+        transcript = transcript[:WINDOW_CHARS]
+        prompt = corrector._detection_prompt(f"TRANSCRIPCIÓ:\n{transcript}", vocab_text, '', '')
+        print(f"📄 {path.name} ({len(transcript)} caràcters)")
+        for rep in range(1, repetitions + 1):
+            for mode in MODES:
+                t0 = time.perf_counter()
+                try:
+                    row = calls[mode](corrector.llm.model, prompt)
+                    row['error'] = None
+                except Exception as e:
+                    row = {'build_s': None, 'prompt_tokens': None, 'completion_tokens': None,
+                           'corrections': None, 'error': str(e)}
+                row = {'note': path.name, 'mode': mode, 'rep': rep,
+                       'latency_s': round(time.perf_counter() - t0, 3), **row}
+                if row['error']:
+                    print(f"  ❌ {mode} #{rep}: {row['error']}")
+                else:
+                    row['build_s'] = round(row['build_s'], 4)
+                    print(f"  {mode:<8} #{rep}: {row['latency_s']:.2f}s (construcció {row['build_s'] * 1000:.1f} ms) · "
+                          f"{row['prompt_tokens']} + {row['completion_tokens']} tokens · "
+                          f"{row['corrections']} correccions")
+                rows.append(row)
+    return rows
+
+
+def summarize(rows: list[dict]) -> dict:
+    summary = {}
+    for mode in MODES:
+        ok = [r for r in rows if r['mode'] == mode and not r['error']]
+        if not ok:
+            continue
+        summary[mode] = {
+            key: sum(r[key] for r in ok) / len(ok)
+            for key in ('latency_s', 'build_s', 'prompt_tokens', 'completion_tokens')
+        }
+    return summary
+
+
+def print_summary(summary: dict, imports: dict):
+    print(f"\n{'─'*78}")
+    print(f"{'Camí':<10} {'Importació':>11} {'Construcció':>12} {'Latència':>10} {'Tokens in':>10} {'Tokens out':>11}")
+    print(f"{'─'*78}")
+    for mode, s in summary.items():
+        print(f"{mode:<10} {imports[mode]:>10.2f}s {s['build_s'] * 1000:>10.1f}ms {s['latency_s']:>9.2f}s "
+              f"{s['prompt_tokens']:>10.0f} {s['completion_tokens']:>11.0f}")
+    if len(summary) == 2 and summary['crew']['prompt_tokens']:
+        crew, direct = summary['crew'], summary['directe']
+        saved = crew['prompt_tokens'] - direct['prompt_tokens']
+        print(f"\nEstalvi per crida: {crew['latency_s'] - direct['latency_s']:.2f}s · "
+              f"{saved:.0f} tokens d'entrada ({saved / crew['prompt_tokens']:.0%})")
+
+
+def save_report(rows: list[dict], summary: dict, imports: dict, output: Path | None = None) -> tuple[Path, Path]:
+    if output is None:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = OUTPUT_DIR / f"llm_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    csv_path = output.with_suffix('.csv')
+    json_path = output.with_suffix('.json')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    json_path.write_text(json.dumps({
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "import_s": imports,
+        "summary": summary,
+        "results": rows,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    return csv_path, json_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara latència i tokens de CrewAI amb les crides directes")
+    parser.add_argument("notes", nargs="+", help="Notes de reunió amb secció ## Transcripció")
+    parser.add_argument("--vocab", required=True, help="Fitxer Vocabulari.md")
+    parser.add_argument("--model", default=None, help="Model (per defecte LLM_MODELH)")
+    parser.add_argument("--repeticions", type=int, default=3)
+    parser.add_argument("--output", "-o", default=None, help="Prefix dels fitxers d'informe (.csv i .json)")
+    args = parser.parse_args()
+
+    import importlib.util
+    if importlib.util.find_spec('crewai') is None:
+        sys.exit("❌ Aquest benchmark necessita crewai, que ja no és dependència del projecte: pip install crewai")
+
+    load_dotenv()
+    os.environ['LLM_CACHE'] = '0'
+    _patch_crewai_stop()
+
+    imports = {'crew': import_time('crewai'), 'directe': import_time('llm_completion')}
+    vocab = VocabularyLoader(Path(args.vocab)).load()
+    rows = run_benchmark([Path(n) for n in args.notes], vocab, args.model, args.repeticions)
+    summary = summarize(rows)
+    print_summary(summary, imports)
+    csv_path, json_path = save_report(rows, summary, imports, Path(args.output) if args.output else None)
+    print(f"\n💾 Informe: {csv_path}\n💾 Informe: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Memòria cau persistent de respostes del LLM (SQLite)
+Clau: model + prompt normalitzat (espais col·lapsats) + paràmetres. Les
+entrades caduquen al cap de LLM_CACHE_DIES dies i, si la mida total supera
+LLM_CACHE_MB, s'eliminen les menys usades (LRU). Els encerts i fallades es
+comptabilitzen a la mateixa base de dades.
+
+Es desactiva amb LLM_CACHE=0.
+
+Ús:
+    python src/llm_cache.py inspect
+    python src/llm_cache.py purge [--dies N]
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / 'data' / 'llm_cache.sqlite'
+MAX_CACHE_MB = float(os.getenv('LLM_CACHE_MB', '100'))
+TTL_DAYS = float(os.getenv('LLM_CACHE_DIES', '30'))
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+class LLMCache:
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = int(MAX_CACHE_MB * 1024 * 1024),
+                 ttl_days: float = TTL_DAYS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_days * 86400
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, model TEXT, kind TEXT, response TEXT,
+                size INTEGER, created REAL, accessed REAL, hits INTEGER DEFAULT 0)""")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # Una connexió per fil: els workers de la GUI criden des de QThreads diferents
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def make_key(self, model: str, prompt: str, **params) -> str:
+        raw = json.dumps([model, normalize_prompt(prompt), params], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, db, name: str):
+        db.execute("INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._conn() as db:
+            row = db.execute("SELECT response, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_s:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count(db, 'misses')
+                return None
+            db.execute("UPDATE entries SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._count(db, 'hits')
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = '', kind: str = ''):
+        now = time.time()
+        with self._conn() as db:
+            db.execute("INSERT OR REPLACE INTO entries (key, model, kind, response, size, created, accessed) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (key, model, kind, response, len(response.encode('utf-8')), now, now))
+        self.evict()
+
+    def evict(self):
+        with self._conn() as db:
+            db.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl_s,))
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                if total <= self.max_bytes:
+                    break
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+
+    def purge(self, older_than_days: float | None = None) -> int:
+        limit = time.time() - older_than_days * 86400 if older_than_days is not None else float('inf')
+        with self._conn() as db:
+            return db.execute("DELETE FROM entries WHERE accessed < ?", (limit,)).rowcount
+
+    def stats(self) -> dict:
+        db = self._conn()
+        counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'entries': entries, 'bytes': size, 'hits': hits, 'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def entries(self) -> list[tuple]:
+        return self._conn().execute(
+            "SELECT key, model, kind, size, accessed, hits FROM entries ORDER BY accessed DESC"
+        ).fetchall()
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache | None:
+    """Instància compartida del procés (None si LLM_CACHE=0)."""
+    global _cache
+    if os.getenv('LLM_CACHE', '1') == '0':
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_call(model: str, prompt: str, call, kind: str = '', **params) -> str:
+    """Retorna la resposta desada per (model, prompt, params) o crida call() i la desa.
+
+    call ha de retornar el text de la resposta; les respostes buides no es desen.
+    """
+    cache = get_cache()
+    if cache is None:
+        return call()
+    key = cache.make_key(model, prompt, kind=kind, **params)
+    response = cache.get(key)
+    if response is not None:
+        return response
+    response = call()
+    if response:
+        cache.put(key, response, model=model, kind=kind)
+    return response
+
+
+def cached_completion(prompt: str, model: str = None, kind: str = 'completion', **params) -> str:
+    """litellm.completion amb un sol missatge d'usuari, a través de la memòria cau."""
+    import litellm
+    from llm_retry import call_with_retry
+    from rate_limiter import estimate_tokens
+    model = model or os.getenv('LLM_MODELH')
+
+    def _call():
+        response = call_with_retry(
+            lambda: litellm.completion(model=model, messages=[{"role": "user", "content": prompt}], **params),
+            tokens=estimate_tokens(prompt), label=kind
+        )
+        return response.choices[0].message.content.strip()
+
+    return cached_call(model, prompt, _call, kind=kind, **params)
+
+
+def _inspect(cache: LLMCache):
+    st = cache.stats()
+    print(f"Base de dades: {cache.path}")
+    print(f"{'Clau':<14} {'Tipus':<14} {'Mida':>9}  {'Últim ús':<16} {'Encerts':>7}  Model")
+    for key, model, kind, size, accessed, hits in cache.entries():
+        last = time.strftime('%Y-%m-%d %H:%M', time.localtime(accessed))
+        print(f"{key[:12]:<14} {kind[:14]:<14} {size / 1024:7.1f}KB  {last:<16} {hits:>7}  {model}")
+    print(f"\n{st['entries']} entrades · {st['bytes'] / 1024 / 1024:.1f} MB de {cache.max_bytes / 1024 / 1024:.0f} MB")
+    print(f"Encerts: {st['hits']} · Fallades: {st['misses']} · Taxa d'encert: {st['hit_rate']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecciona o buida la memòria cau de respostes del LLM")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('inspect', help="Llista les entrades, la mida total i els encerts")
+    p_purge = sub.add_parser('purge', help="Elimina entrades")
+    p_purge.add_argument('--dies', type=float, default=None,
+                         help="Només les entrades no usades en aquests dies (per defecte, totes)")
+    args = parser.parse_args()
+
+    cache = LLMCache()
+    if args.cmd == 'inspect':
+        _inspect(cache)
+    else:
+        print(f"🗑️  {cache.purge(args.dies)} entrades eliminades")
+
+
+if __name__ == '__main__':
+    main()
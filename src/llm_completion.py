@@ -0,0 +1,165 @@
+"""
+Crides directes al LLM (litellm) amb sortida tipada
+Substitueix la construcció d'un Agent, una Task i una Crew de CrewAI a cada
+crida: el rol de l'agent va al missatge de sistema, la descripció de la tasca
+al missatge d'usuari i, si es demana un model pydantic, s'hi afegeix l'esquema
+JSON esperat i la resposta es valida amb el model. No s'envia el paràmetre
+'stop' (alguns models no el suporten), de manera que ja no cal apedaçar CrewAI.
+
+Totes les crides passen per la memòria cau (llm_cache) i pels reintents amb
+limitació de ritme (llm_retry).
+
+stream_items() demana la resposta en streaming i en retorna els objectes de la
+llista a mesura que es completen (json_stream). Si el model admet sortida
+restringida per esquema (litellm.supports_response_schema), s'envia l'esquema
+com a response_format i el model no pot generar JSON mal format.
+"""
+
+import os
+import json
+import threading
+from dataclasses import dataclass
+from typing import TypeVar
+
+import litellm
+from pydantic import BaseModel
+from json_repair import repair_json
+
+from json_stream import JSONArrayStream
+from llm_cache import cached_call, get_cache
+from llm_retry import call_with_retry
+from rate_limiter import estimate_tokens
+
+T = TypeVar('T', bound=BaseModel)
+
+
+@dataclass(frozen=True)
+class Role:
+    """El que abans eren role, goal i backstory de l'Agent."""
+    role: str
+    goal: str
+    backstory: str
+
+    def system_prompt(self) -> str:
+        return f"Ets: {self.role}. {self.backstory}\nEl teu objectiu: {self.goal}"
+
+
+def schema_instructions(output: type[BaseModel]) -> str:
+    schema = json.dumps(output.model_json_schema(), ensure_ascii=False)
+    return ("\n\nRetorna ÚNICAMENT un objecte JSON, sense blocs de codi ni text addicional, "
+            f"que compleixi aquest esquema:\n{schema}")
+
+
+def supports_schema(model: str) -> bool:
+    try:
+        return bool(litellm.supports_response_schema(model=model))
+    except Exception:
+        return False
+
+
+def response_format(output: type[BaseModel]) -> dict:
+    return {"type": "json_schema",
+            "json_schema": {"name": output.__name__, "schema": output.model_json_schema(), "strict": True}}
+
+
+def parse_output(raw: str, output: type[T]) -> T:
+    """Valida la resposta amb el model (tolera JSON mal tancat o envoltat de text)."""
+    data = repair_json(raw, return_objects=True)
+    if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+        data = data[0]
+    return output.model_validate(data)
+
+
+class CompletionLLM:
+    """Client mínim: un missatge de sistema opcional i un d'usuari per crida."""
+
+    def __init__(self, model: str = None, **params):
+        self.model = model or os.getenv('LLM_MODELH')
+        self.params = params
+        # Tokens de les crides fetes (no compta les servides per la memòria cau)
+        self.usage = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        self._lock = threading.Lock()
+
+    def _messages(self, prompt: str, role: Role = None) -> list[dict]:
+        messages = [{"role": "system", "content": role.system_prompt()}] if role else []
+        return messages + [{"role": "user", "content": prompt}]
+
+    def _add_usage(self, usage):
+        with self._lock:
+            self.usage['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+            self.usage['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def _request(self, messages: list[dict], label: str) -> str:
+        tokens = estimate_tokens(''.join(m['content'] for m in messages))
+        response = call_with_retry(
+            lambda: litellm.completion(model=self.model, messages=messages, drop_params=True, **self.params),
+            tokens=tokens, label=label
+        )
+        with self._lock:
+            self.usage['calls'] += 1
+        self._add_usage(getattr(response, 'usage', None))
+        return (response.choices[0].message.content or '').strip()
+
+    def complete(self, prompt: str, role: Role = None, label: str = 'LLM', kind: str = 'completion') -> str:
+        """Text de la resposta (a través de la memòria cau)."""
+        messages = self._messages(prompt, role)
+        cache_prompt = '\n\n'.join(m['content'] for m in messages)
+        return cached_call(self.model, cache_prompt, lambda: self._request(messages, label),
+                           kind=kind, **self.params)
+
+    def complete_model(self, prompt: str, output: type[T], role: Role = None, label: str = 'LLM') -> T:
+        """Resposta validada com a instància de output.
+
+        A la memòria cau només s'hi desa la resposta ja validada, de manera que
+        una resposta que no compleix l'esquema no es reutilitza.
+        """
+        messages = self._messages(prompt + schema_instructions(output), role)
+        cache_prompt = '\n\n'.join(m['content'] for m in messages)
+
+        def _call():
+            return parse_output(self._request(messages, label), output).model_dump_json()
+
+        raw = cached_call(self.model, cache_prompt, _call, kind=output.__name__, **self.params)
+        return output.model_validate_json(raw)
+
+    def stream_items(self, prompt: str, role: Role = None, schema: type[BaseModel] = None,
+                     label: str = 'LLM', kind: str = 'stream', parser: JSONArrayStream = None):
+        """Genera els objectes de la llista de la resposta a mesura que es completen.
+
+        schema és el model de la resposta sencera (p. ex. {"correccions": [...]});
+        només s'envia si el model admet sortida restringida. La resposta completa
+        es desa a la memòria cau en acabar, i un encert es llegeix d'un sol cop.
+        Els objectes que no es poden llegir queden a parser.invalid.
+        """
+        parser = parser if parser is not None else JSONArrayStream()
+        messages = self._messages(prompt, role)
+        params = dict(self.params)
+        if schema is not None and supports_schema(self.model):
+            params['response_format'] = response_format(schema)
+
+        cache = get_cache()
+        key = None
+        if cache is not None:
+            key = cache.make_key(self.model, '\n\n'.join(m['content'] for m in messages), kind=kind, **params)
+            cached = cache.get(key)
+            if cached is not None:
+                yield from parser.feed(cached)
+                return
+
+        tokens = estimate_tokens(''.join(m['content'] for m in messages))
+        stream = call_with_retry(
+            lambda: litellm.completion(model=self.model, messages=messages, stream=True,
+                                       stream_options={"include_usage": True}, drop_params=True, **params),
+            tokens=tokens, label=label
+        )
+        with self._lock:
+            self.usage['calls'] += 1
+        for chunk in stream:
+            if getattr(chunk, 'usage', None):
+                self._add_usage(chunk.usage)
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield from parser.feed(delta)
+        # Una resposta tallada no es desa: la crida següent la tornarà a demanar
+        if key is not None and parser.complete():
+            cache.put(key, parser.text, model=self.model, kind=kind)
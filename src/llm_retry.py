@@ -0,0 +1,88 @@
+"""
+Reintents de crides al LLM amb backoff exponencial, jitter i Retry-After
+Si el proveïdor indica quant cal esperar (capçalera Retry-After, retry-after-ms
+o "try again in Ns" al missatge), s'espera exactament això; si no, backoff
+exponencial amb jitter complet. Cada 429 també redueix el ritme global de
+peticions (AIMD a rate_limiter) i cada resposta correcta el torna a pujar.
+"""
+
+import re
+import time
+import random
+
+from rate_limiter import get_limiter
+
+MAX_RETRIES = 6
+BASE_DELAY_S = 1.0
+MAX_DELAY_S = 60.0
+TRANSIENT_STATUS = {408, 409, 500, 502, 503, 504, 529}
+
+
+def _status(exc) -> int | None:
+    for attr in ('status_code', 'status', 'code'):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, 'response', None)
+    value = getattr(response, 'status_code', None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit(exc) -> bool:
+    if _status(exc) == 429 or type(exc).__name__ == 'RateLimitError':
+        return True
+    msg = str(exc)
+    return '429' in msg or 'Too Many Requests' in msg or 'rate_limit' in msg.lower() or 'RESOURCE_EXHAUSTED' in msg
+
+
+def is_transient(exc) -> bool:
+    if _status(exc) in TRANSIENT_STATUS:
+        return True
+    return type(exc).__name__ in ('Timeout', 'APIConnectionError', 'ServiceUnavailableError',
+                                  'InternalServerError', 'APITimeoutError')
+
+
+def retry_after(exc) -> float | None:
+    """Segons d'espera que suggereix el proveïdor, si n'hi ha."""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(exc, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass   # Retry-After en format de data HTTP: es fa servir el backoff
+    m = re.search(r'(?:try again in|retry in|retryDelay["\']?:\s*["\']?)\s*([\d.]+)\s*(ms|s)?', str(exc), re.I)
+    if m:
+        value = float(m.group(1))
+        return value / 1000 if m.group(2) and m.group(2).lower() == 'ms' else value
+    return None
+
+
+def call_with_retry(fn, tokens: int = 0, label: str = 'LLM', max_retries: int = MAX_RETRIES,
+                    base_delay: float = BASE_DELAY_S, max_delay: float = MAX_DELAY_S):
+    """Executa fn() passant pel limitador global i reintentant errors 429 i transitoris.
+
+    tokens: estimació dels tokens de la petició (per al límit de tokens per minut).
+    """
+    limiter = get_limiter()
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        issued_at = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            rate_limited = is_rate_limit(e)
+            if attempt == max_retries or not (rate_limited or is_transient(e)):
+                raise
+            if rate_limited:
+                rpm = limiter.on_rate_limited(issued_at)
+            hint = retry_after(e)
+            delay = hint if hint is not None else random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            reason = f"429 (ritme global {rpm:.0f}/min)" if rate_limited else type(e).__name__
+            print(f"[{label}] {reason}, reintent {attempt + 1}/{max_retries} en {delay:.1f}s...")
+            time.sleep(delay)
+        else:
+            limiter.on_success()
+            return result
@@ -1,8 +1,8 @@
-import os
 import re
 from pathlib import Path
 from pydantic import BaseModel
-from crewai import Agent, Task, Crew, LLM
+
+from llm_completion import CompletionLLM, Role
 
 
 class ActiveTopicUpdate(BaseModel):
@@ -28,9 +28,16 @@ def parse_active_topics(estat_path: Path) -> list[str]:
     return topics
 
 
+ANALYST_ROLE = Role(
+    role="Analista de reunions de seguiment",
+    goal="Analitzar una transcripció de reunió i extreure resums per cada tema tractat",
+    backstory="Expert en anàlisi de reunions de seguiment de projectes tecnològics en català.",
+)
+
+
 class MeetingAnalyzer:
     def __init__(self, model: str = None):
-        self.llm = LLM(model=model or os.getenv('LLM_MODELH'), drop_params=True)
+        self.llm = CompletionLLM(model)
 
     def analyze(self, topics: list[str], transcript: str, brief: bool = False) -> MeetingAnalysisResult:
         topics_list = '\n'.join(f'- {t}' for t in topics)
@@ -40,16 +47,7 @@ class MeetingAnalyzer:
             "escriu un resum de 3-4 línies del que s'ha dit, incloent decisions preses, estat actual i propers passos si s'han mencionat."
         )
 
-        agent = Agent(
-            role="Analista de reunions de seguiment",
-            goal="Analitzar una transcripció de reunió i extreure resums per cada tema tractat",
-            backstory="Expert en anàlisi de reunions de seguiment de projectes tecnològics en català.",
-            llm=self.llm,
-            verbose=False
-        )
-
-        task = Task(
-            description=f"""
+        prompt = f"""
 Analitza la transcripció d'una reunió de seguiment i determina quins temes s'han tractat.
 
 TEMES OBERTS ACTUALS:
@@ -64,17 +62,12 @@ INSTRUCCIONS:
 - Si un tema no s'ha tractat, NO l'incloguis a updated_topics.
 - Si s'han tractat temes nous que no estan a la llista de temes oberts, afegeix-los a new_other_topics amb una descripció breu.
 - El camp topic_name ha de coincidir EXACTAMENT amb el nom del tema tal com apareix a la llista.
-""",
-            expected_output="MeetingAnalysisResult amb els temes tractats i nous temes",
-            agent=agent,
-            output_pydantic=MeetingAnalysisResult
-        )
+"""
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
         print("  → Agent analista iniciat...")
-        result = crew.kickoff()
+        result = self.llm.complete_model(prompt, MeetingAnalysisResult, role=ANALYST_ROLE, label='MeetingAnalyzer')
         print("  ✓ Agent analista finalitzat\n")
-        return result.pydantic
+        return result
 
 
 class StateFileUpdater:
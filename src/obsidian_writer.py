@@ -1,6 +1,9 @@
 import re
 from pathlib import Path
 
+from segment_sidecar import write_segments, rename_sidecar
+from confidence_spans import extract_spans, write_spans, rename_spans
+
 
 class ObsidianWriter:
     def __init__(self, vault_path):
@@ -107,15 +110,32 @@ class ObsidianWriter:
             content = historic_path.read_text(encoding='utf-8')
             historic_path.write_text(content + entry, encoding='utf-8')
 
-    def create_simple_note(self, meeting: dict, transcripcio: str, target_dir) -> bool:
-        from pathlib import Path
-        target_dir = Path(target_dir)
+    def find_meeting_dir(self, title: str) -> Path | None:
+        """Cerca la carpeta Reunions/<Tipus>/<títol>/Reunions d'una sèrie existent."""
+        names = {title, self._clean(title)}
+        for type_folder in self.find_meeting_types():
+            for sub in self.find_subfolders(type_folder):
+                if sub in names:
+                    return self.vault / 'Reunions' / type_folder / sub / 'Reunions'
+        return None
+
+    def simple_note_path(self, meeting: dict, target_dir) -> Path:
         data = meeting['start'].strftime('%y%m%d')
         nom_fitxer = self._clean(meeting['title'])
-        path = target_dir / f"{data}_{nom_fitxer}.md"
+        return Path(target_dir) / f"{data}_{nom_fitxer}.md"
+
+    def create_simple_note(self, meeting: dict, transcripcio: str, target_dir, segments: list = None) -> bool:
+        """Crea la nota; si es passen els segments de Whisper, en desa també el sidecar
+        (i l'índex de trams de baixa confiança si porten probabilitats per paraula)."""
+        target_dir = Path(target_dir)
+        path = self.simple_note_path(meeting, target_dir)
         try:
             target_dir.mkdir(parents=True, exist_ok=True)
             path.write_text(self._gen_content(meeting, transcripcio), encoding='utf-8')
+            if segments:
+                write_segments(path, segments)
+                if any('words' in s for s in segments):
+                    write_spans(path, extract_spans(segments))
             return True
         except Exception:
             return False
@@ -224,6 +244,7 @@ from: "{thread['from']}"
         """Afegeix ~ al stem per indicar que la transcripció ha estat corregida."""
         new_path = path.with_stem(path.stem + '~')
         path.rename(new_path)
+        self._rename_sidecars(path, new_path)
         return new_path
 
     def find_corrected_notes(self) -> list:
@@ -273,6 +294,15 @@ from: "{thread['from']}"
         new_content = content[:idx + len(marker)] + '\n\n' + new_transcript + '\n'
         path.write_text(new_content, encoding='utf-8')
 
+    def append_transcript_segment(self, path: Path, text: str):
+        """Afegeix un segment al final de la secció ## Transcripció (que és l'última de la nota).
+
+        Escriu en mode 'append' sense rellegir la nota, de manera que la memòria
+        no creix amb la durada de la transcripció.
+        """
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text + '\n')
+
     def mark_as_processed(self, path: Path) -> Path:
         stem = path.stem
         if stem.endswith('~'):
@@ -281,8 +311,13 @@ from: "{thread['from']}"
             new_stem = stem + '*'
         new_path = path.with_stem(new_stem)
         path.rename(new_path)
+        self._rename_sidecars(path, new_path)
         return new_path
 
+    def _rename_sidecars(self, old_path: Path, new_path: Path):
+        rename_sidecar(old_path, new_path)
+        rename_spans(old_path, new_path)
+
     def update_project_fields(self, note_path: Path, data_inici: str, resum: str):
         content = note_path.read_text(encoding='utf-8')
         content = re.sub(r'^Data inici:.*$', f'Data inici: {data_inici}', content, flags=re.MULTILINE)
@@ -0,0 +1,196 @@
+"""
+Transcripció paral·lela per fragments de veu (VAD) per a gravacions llargues
+L'àudio es talla als silencis, cada fragment es transcriu en un procés amb
+la seva pròpia rèplica del model i els segments es tornen a cosir amb
+timestamps globals.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import transcribe_test_2 as tt
+
+SAMPLE_RATE = 16000
+
+# Durada màxima d'un fragment. Fragments més llargs = menys talls però
+# menys paral·lelisme en reunions curtes.
+MAX_CHUNK_S = 300.0
+# Silenci mínim (ms) per considerar un punt de tall vàlid
+MIN_SILENCE_MS = 500
+# Dos segments de fragments veïns es consideren la mateixa veu si entre el final
+# d'un i l'inici de l'altre hi ha menys d'aquest marge (imprecisió dels timestamps)
+BOUNDARY_TOLERANCE_S = 0.2
+
+# Model de cada procés del pool (un per rèplica)
+_worker_model = None
+
+
+def _init_worker(cpu_threads: int):
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        tt.MODEL_ID, device=tt.DEVICE, compute_type=tt.COMPUTE_TYPE, cpu_threads=cpu_threads
+    )
+
+
+def _transcribe_chunk(index: int, npy_path: str, start: int, end: int, use_prompt: bool,
+                      prompt: str | None = None, hotwords: str | None = None) -> tuple[int, list[dict]]:
+    import numpy as np
+    # Cada procés obre el mateix .npy amb mmap: el fragment no es copia entre processos
+    audio = np.load(npy_path, mmap_mode='r')[start:end]
+    extra = {"hotwords": hotwords} if hotwords and use_prompt else {}
+    segments_gen, _ = _worker_model.transcribe(
+        audio,
+        language="ca",
+        beam_size=tt.BEAM_SIZE,
+        initial_prompt=(prompt or tt.INITIAL_PROMPT) if use_prompt else None,
+        word_timestamps=False,
+        **extra,
+    )
+    return index, [tt.segment_dict(s) for s in segments_gen]
+
+
+def plan_chunks(speech: list[dict], total_samples: int, max_chunk_s: float = MAX_CHUNK_S) -> list[tuple[int, int]]:
+    """
+    Agrupa les regions de veu en fragments de com a màxim max_chunk_s.
+
+    Els talls es fan al punt mig del silenci entre dues regions, de manera
+    que els fragments són contigus, no se solapen i cobreixen tot l'àudio:
+    cap paraula queda partida ni repetida entre dos fragments.
+
+    Returns:
+        Llista de (mostra_inici, mostra_fi)
+    """
+    if not speech:
+        return [(0, total_samples)] if total_samples else []
+
+    max_len = int(max_chunk_s * SAMPLE_RATE)
+    chunks = []
+    chunk_start = 0
+    for prev, nxt in zip(speech, speech[1:]):
+        cut = (prev["end"] + nxt["start"]) // 2
+        if nxt["end"] - chunk_start > max_len and cut > chunk_start:
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    chunks.append((chunk_start, total_samples))
+    return chunks
+
+
+def _normalize_words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def stitch_segments(chunk_results: list[tuple[float, float, list[dict]]], max_overlap_words: int = 8) -> list[dict]:
+    """
+    Cus els segments de cada fragment amb timestamps globals.
+
+    Args:
+        chunk_results: Llista ordenada de (offset_s, fi_s, segments locals)
+
+    A la frontera entre fragments Whisper de vegades repeteix l'última frase
+    o en torna a escriure les darreres paraules: s'eliminen els segments
+    duplicats i les paraules inicials que repeteixen el final de l'anterior.
+    Només es fa quan els dos segments es toquen a la frontera (vegeu
+    BOUNDARY_TOLERANCE_S): els talls són en silencis, de manera que una
+    repetició real («sí», «d'acord») en queda separada i es conserva.
+    """
+    stitched = []
+    for offset, chunk_end, segments in chunk_results:
+        first_in_chunk = True
+        for seg in segments:
+            start = offset + seg["start"]
+            end = min(offset + seg["end"], chunk_end)
+            text = seg["text"]
+            if not text:
+                continue
+            if first_in_chunk and stitched and start - stitched[-1]["end"] < BOUNDARY_TOLERANCE_S:
+                prev = stitched[-1]
+                prev_words = _normalize_words(prev["text"])
+                words = _normalize_words(text)
+                if words == prev_words:
+                    continue
+                overlap = 0
+                for n in range(min(max_overlap_words, len(prev_words), len(words)), 0, -1):
+                    if prev_words[-n:] == words[:n]:
+                        overlap = n
+                        break
+                if overlap:
+                    # Treure les n primeres paraules conservant la puntuació de la resta
+                    parts = re.split(r"(\w+)", text)
+                    seen = 0
+                    for i, part in enumerate(parts):
+                        if re.fullmatch(r"\w+", part):
+                            seen += 1
+                            if seen == overlap:
+                                text = "".join(parts[i + 1:]).lstrip(" ,.;:")
+                                break
+                    if not text:
+                        continue
+            first_in_chunk = False
+            stitched.append(dict(seg, start=start, end=end, text=text))
+    return stitched
+
+
+def transcribe_parallel(audio_path: str, use_prompt: bool = True, replicas: int = 2,
+                        max_chunk_s: float = MAX_CHUNK_S, prompt: str | None = None,
+                        hotwords: str | None = None) -> dict:
+    """
+    Transcriu un fitxer llarg repartint fragments de veu entre processos.
+
+    Args:
+        audio_path: Ruta al fitxer d'àudio
+        use_prompt: Si True, aplica l'initial_prompt configurat a cada fragment
+        replicas: Nombre màxim de processos (i còpies del model en memòria)
+        max_chunk_s: Durada màxima de cada fragment
+        prompt: initial_prompt a usar en lloc d'INITIAL_PROMPT
+        hotwords: termes a reforçar (paràmetre hotwords de faster-whisper)
+
+    Returns:
+        El mateix dict que transcribe_test_2.transcribe(), més 'chunks'
+    """
+    import numpy as np
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    from audio_cache import cached_audio_path
+
+    t1 = time.time()
+    npy_path = cached_audio_path(audio_path)
+    audio = np.load(npy_path, mmap_mode='r')
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=MIN_SILENCE_MS))
+    chunks = plan_chunks(speech, len(audio), max_chunk_s)
+
+    replicas = max(1, min(replicas, len(chunks)))
+    cpu_threads = max(1, (os.cpu_count() or 1) // replicas)
+    print(f"✂️  {len(chunks)} fragments · {replicas} rèpliques × {cpu_threads} fils")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=replicas, initializer=_init_worker,
+                             initargs=(cpu_threads,)) as pool:
+        futures = [
+            pool.submit(_transcribe_chunk, i, str(npy_path), start, end, use_prompt, prompt, hotwords)
+            for i, (start, end) in enumerate(chunks)
+        ]
+        for future in futures:
+            index, segments = future.result()
+            results[index] = segments
+            print(f"  ✓ Fragment {index + 1}/{len(chunks)}")
+
+    segments = stitch_segments([
+        (start / SAMPLE_RATE, end / SAMPLE_RATE, results[i])
+        for i, (start, end) in enumerate(chunks)
+    ])
+    t_transcribe = time.time() - t1
+    duration = len(audio) / SAMPLE_RATE
+
+    return {
+        "text": " ".join(s["text"] for s in segments),
+        "segments": segments,
+        "duration": duration,
+        "elapsed": t_transcribe,
+        "rtf": t_transcribe / duration if duration else 0.0,
+        "language": "ca",
+        # L'idioma es força a "ca" com a transcribe(): faster-whisper no en calcula la probabilitat
+        "language_prob": 1.0,
+        "chunks": len(chunks),
+    }
@@ -0,0 +1,200 @@
+"""
+Índex fonètic del vocabulari per trobar errors de l'ASR sense LLM
+Cada terme de Vocabulari.md es redueix a una clau fonètica aproximada del
+català (h muda, b/v, c/qu/k, s/z/ç, reducció de vocals àtones...). La
+transcripció es recorre per n-grames de paraules i es busquen termes amb una
+clau igual o a poca distància d'edició, amb un índex d'esborrats (SymSpell)
+per no comparar-ho tot amb tot.
+
+Exemples: "queimei" → KAIMAI (clau 'kaimai'), "onea" → HONOA ('una' / 'unua').
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+MAX_NGRAM = 3
+# Puntuació mínima per proposar un candidat, i a partir de la qual es considera segur
+MIN_SCORE = 0.6
+SURE_SCORE = 0.9
+SKIP_SECTIONS = {'Configuració'}
+
+STOPWORDS = {
+    'a', 'al', 'als', 'amb', 'com', 'de', 'del', 'dels', 'el', 'els', 'en', 'es', 'és', 'et', 'ha',
+    'hi', 'i', 'jo', 'la', 'les', 'li', 'lo', 'em', 'me', 'ens', 'ho', 'no', 'o', 'per', 'perquè',
+    'què', 'que', 'se', 'si', 'sí', 'un', 'una', 'uns', 'unes', 'va', 'y', 'ja', 'ni', 'pel',
+    'pels', 'su', 'te', 'tu', 'ara', 'molt', 'doncs', 'bé', 'pues', 'eh', 'això', 'allò', 'aquí',
+}
+
+# Substitucions ordenades (la primera que encaixa guanya a cada posició)
+_RULES = [
+    (r'l·l', 'l'), (r'tx', 'x'), (r'tj', 'x'), (r'tg', 'x'), (r'ig\b', 'x'), (r'sh', 'x'), (r'ch', 'x'),
+    (r'ny', 'n'), (r'ph', 'f'), (r'th', 't'),
+    (r'qu(?=[ei])', 'k'), (r'gu(?=[ei])', 'g'), (r'q', 'k'),
+    (r'c(?=[ei])', 's'), (r'g(?=[ei])', 'x'), (r'j', 'x'), (r'c', 'k'), (r'ç', 's'),
+    (r'z', 's'), (r'v', 'b'), (r'w', 'u'), (r'y', 'i'), (r'h', ''),
+    (r'ee', 'i'), (r'oo', 'u'), (r'e', 'a'), (r'o', 'u'),
+]
+_RULES_RE = re.compile('|'.join(f'({p})' for p, _ in _RULES))
+
+
+def _strip_accents(text: str) -> str:
+    text = text.replace('ç', '\x00').replace('Ç', '\x00')
+    text = ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+    return text.replace('\x00', 'ç')
+
+
+def phonetic_key(text: str) -> str:
+    """Clau fonètica aproximada (en català) d'una paraula o expressió; ignora espais i puntuació."""
+    text = _strip_accents(text.lower())
+    text = re.sub(r"[^\w·ç]+", ' ', text)
+
+    def _sub(m):
+        return _RULES[m.lastindex - 1][1]
+
+    key = _RULES_RE.sub(_sub, text).replace(' ', '').replace('_', '')
+    # Lletres dobles (ss, rr, ll, tt...) → una de sola
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+def edit_distance(a: str, b: str, max_dist: int) -> int:
+    """Distància de Levenshtein; retorna max_dist + 1 si la supera."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev = cur
+    return prev[-1]
+
+
+def _max_distance(key: str) -> int:
+    if len(key) <= 3:
+        return 0
+    return 1 if len(key) <= 6 else 2
+
+
+def _deletes(key: str, depth: int) -> set[str]:
+    result = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def clean_term(term: str) -> str:
+    """Treu descripcions entre parèntesis o després de ':' / ' - ' (p. ex. "HONOA (porta)")."""
+    return re.split(r'\s+\(|:\s|\s[-–—]\s', term, maxsplit=1)[0].strip()
+
+
+class PhoneticIndex:
+    def __init__(self, vocab: dict[str, list[str]]):
+        self.terms: dict[str, list[str]] = {}      # clau → termes
+        self._deletes: dict[str, set[str]] = {}    # esborrat → claus
+        for section, terms in vocab.items():
+            if section in SKIP_SECTIONS:
+                continue
+            for term in terms:
+                term = clean_term(term)
+                key = phonetic_key(term)
+                if len(key) < 3:
+                    continue
+                self.terms.setdefault(key, [])
+                if term not in self.terms[key]:
+                    self.terms[key].append(term)
+                for d in _deletes(key, _max_distance(key)):
+                    self._deletes.setdefault(d, set()).add(key)
+        self.max_words = max((len(t.split()) for ts in self.terms.values() for t in ts), default=1)
+
+    def __len__(self):
+        return sum(len(ts) for ts in self.terms.values())
+
+    def lookup(self, text: str) -> list[tuple[str, float]]:
+        """Termes semblants a text amb la seva puntuació (0-1), de més a menys semblant."""
+        key = phonetic_key(text)
+        if len(key) < 3:
+            return []
+        keys = set()
+        for d in _deletes(key, _max_distance(key)):
+            keys |= self._deletes.get(d, set())
+        plain = _strip_accents(text.lower())
+        results = []
+        for k in keys:
+            limit = max(_max_distance(k), _max_distance(key))
+            dist = edit_distance(key, k, limit)
+            if dist > limit:
+                continue
+            phonetic = 1.0 - dist / max(len(key), len(k))
+            for term in self.terms[k]:
+                spelling = SequenceMatcher(None, plain, _strip_accents(term.lower())).ratio()
+                results.append((term, round(0.75 * phonetic + 0.25 * spelling, 3)))
+        return sorted(results, key=lambda r: -r[1])
+
+    def scan(self, transcript: str, min_score: float = MIN_SCORE) -> list[dict]:
+        """Recorre la transcripció i proposa candidats en format de correcció.
+
+        Cada candidat: {"original", "correccio", "motiu", "frase", "confiança", "inici", "fi"}.
+        Els candidats no se solapen: a igual posició guanya el de més puntuació.
+        """
+        words = [(m.start(), m.end()) for m in re.finditer(r"[\w·'’-]+", transcript)]
+        known = {t.lower() for ts in self.terms.values() for t in ts}
+        found = []
+        exact: list[tuple[int, int]] = []   # termes del vocabulari ja escrits correctament
+        for i in range(len(words)):
+            # Fins a una paraula més que el terme més llarg ("onea door" → HONOADOOR)
+            for n in range(1, min(self.max_words + 1, MAX_NGRAM) + 1):
+                if i + n > len(words):
+                    break
+                start, end = words[i][0], words[i + n - 1][1]
+                text = transcript[start:end]
+                first = transcript[words[i][0]:words[i][1]].lower()
+                last = transcript[words[i + n - 1][0]:words[i + n - 1][1]].lower()
+                if text.lower() in known:
+                    exact.append((start, end))
+                    continue
+                if first in STOPWORDS or last in STOPWORDS:
+                    continue
+                for term, score in self.lookup(text)[:1]:
+                    if score >= min_score and term.lower() != text.lower():
+                        found.append((score, end - start, start, end, text, term))
+
+        selected = []
+        taken = exact
+        for score, _, start, end, text, term in sorted(found, key=lambda f: (-f[0], -f[1], f[2])):
+            if any(start < e and s < end for s, e in taken):
+                continue
+            taken.append((start, end))
+            selected.append({
+                'original': text,
+                'correccio': term,
+                'motiu': f"Similitud fonètica amb «{term}» (índex local)",
+                'frase': _sentence_at(transcript, start, end),
+                'confiança': score,
+                'inici': start,
+                'fi': end,
+            })
+        return sorted(selected, key=lambda c: c['inici'])
+
+
+_indexes: dict[tuple, PhoneticIndex] = {}
+
+
+def index_for(vocab: dict[str, list[str]]) -> PhoneticIndex:
+    """Índex compartit per a un mateix vocabulari (un lot de notes el construeix un sol cop)."""
+    key = tuple((section, tuple(terms)) for section, terms in vocab.items())
+    if key not in _indexes:
+        _indexes.clear()
+        _indexes[key] = PhoneticIndex(vocab)
+    return _indexes[key]
+
+
+def _sentence_at(text: str, start: int, end: int) -> str:
+    lo = max(text.rfind(p, 0, start) for p in '.!?\n') + 1
+    his = [h for h in (text.find(p, end) for p in '.!?\n') if h != -1]
+    hi = min(his) + 1 if his else len(text)
+    return text[lo:hi].strip()
@@ -0,0 +1,120 @@
+import math
+import re
+from pathlib import Path
+from vocabulary_loader import VocabularyLoader
+import alias_store
+
+# Whisper només fa servir els últims ~223 tokens de l'initial_prompt
+PROMPT_TOKEN_BUDGET = 220
+HOTWORDS_TOKEN_BUDGET = 48
+PROMPT_HEADER = "Reunió de seguiment de JCM Technologies, empresa de R+D."
+SKIP_SECTIONS = {'Configuració'}
+EXTRA_SECTION = 'Altres termes'
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimació del nombre de tokens BPE de Whisper (sense carregar el tokenitzador).
+
+    Les sigles i noms de producte en majúscules es parteixen més que les
+    paraules comunes, per això compten el doble.
+    """
+    tokens = 0
+    for word in re.findall(r"\w+|[^\w\s]", text):
+        if len(word) == 1:
+            tokens += 1
+        elif word.isupper():
+            tokens += math.ceil(len(word) / 2)
+        else:
+            tokens += math.ceil(len(word) / 3)
+    return tokens
+
+
+class PromptBuilder:
+    """Construeix l'initial_prompt i els hotwords de Whisper a partir del vocabulari.
+
+    Els termes es prioritzen pel nombre de vegades que s'han hagut de corregir
+    (Canvis-Memoritzats.md + aliases de semantic_memory.json de la sèrie) i pels
+    projectes/termes habituals de la sèrie, fins omplir el pressupost de tokens.
+    """
+
+    def __init__(self, vocab_path: Path, semantic_memory_path: Path = None, count_tokens=estimate_tokens):
+        self.vocab_path = Path(vocab_path)
+        self.semantic_memory_path = Path(semantic_memory_path) if semantic_memory_path else None
+        self.count_tokens = count_tokens
+
+    def build(self, prompt_budget: int = PROMPT_TOKEN_BUDGET,
+              hotwords_budget: int = HOTWORDS_TOKEN_BUDGET) -> tuple[str, str | None]:
+        """Retorna (initial_prompt, hotwords)."""
+        vocab = VocabularyLoader(self.vocab_path).load()
+        sections = {s: terms for s, terms in vocab.items() if s not in SKIP_SECTIONS and terms}
+        scores = self._score_terms()
+
+        # Termes corregits que encara no són al vocabulari
+        known = {t.lower() for terms in sections.values() for t in terms}
+        extra = list(dict.fromkeys(
+            t for t in self._corrected_terms() if t.lower() not in known
+        ))
+        if extra:
+            sections[EXTRA_SECTION] = extra
+
+        # Tots els termes amb la seva posició original (desempat estable)
+        ranked = []
+        for section, terms in sections.items():
+            for pos, term in enumerate(terms):
+                ranked.append((scores.get(term.lower(), 0.0), section, pos, term))
+        ranked.sort(key=lambda t: -t[0])
+
+        # Hotwords: els termes més corregits
+        hotwords = []
+        used = 0
+        for score, _, _, term in ranked:
+            if score < 1:
+                break
+            cost = self.count_tokens(term) + 1
+            if used + cost > hotwords_budget:
+                break
+            hotwords.append(term)
+            used += cost
+
+        # Prompt: omplir per ordre de rànquing i després agrupar per secció
+        selected: dict[str, list[tuple[int, str]]] = {}
+        used = self.count_tokens(PROMPT_HEADER)
+        for _, section, pos, term in ranked:
+            cost = self.count_tokens(term) + 1
+            if section not in selected:
+                cost += self.count_tokens(section) + 2
+            if used + cost > prompt_budget:
+                continue
+            selected.setdefault(section, []).append((pos, term))
+            used += cost
+
+        lines = [PROMPT_HEADER]
+        for section in sections:
+            if section in selected:
+                terms = [t for _, t in sorted(selected[section])]
+                lines.append(f"{section}: {', '.join(terms)}.")
+        return '\n'.join(lines), (', '.join(hotwords) or None)
+
+    def _corrected_terms(self) -> list[str]:
+        return list(self._load_semantic_memory().get('aliases', {}).values()) + \
+            list(self._load_global_memorized().values())
+
+    def _score_terms(self) -> dict[str, float]:
+        """Puntuació per terme (en minúscules): correccions registrades + presència a la sèrie."""
+        scores: dict[str, float] = {}
+        for correccio in self._load_global_memorized().values():
+            scores[correccio.lower()] = scores.get(correccio.lower(), 0.0) + 1.0
+
+        memory = self._load_semantic_memory()
+        for correccio in memory.get('aliases', {}).values():
+            # Les correccions de la pròpia sèrie pesen més
+            scores[correccio.lower()] = scores.get(correccio.lower(), 0.0) + 2.0
+        for term in memory.get('technical_terms', []) + memory.get('projects', []):
+            scores[term.lower()] = scores.get(term.lower(), 0.0) + 0.5
+        return scores
+
+    def _load_semantic_memory(self) -> dict:
+        return alias_store.semantic_memory(self.semantic_memory_path)
+
+    def _load_global_memorized(self) -> dict:
+        return alias_store.global_aliases(self.vocab_path.parent / 'Canvis-Memoritzats.md')
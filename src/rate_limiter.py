@@ -0,0 +1,166 @@
+"""
+Limitador de peticions i tokens per minut (token bucket)
+Cada petició al LLM consumeix 1 unitat del cubell de peticions (LLM_RPM) i una
+estimació dels seus tokens del cubell de tokens (LLM_TPM). Si no n'hi ha
+prou, el fil s'espera fins que es recarreguen. 0 = sense límit.
+Els 429 redueixen el ritme de peticions de tot el procés (vegeu llm_retry).
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+RPM = float(os.getenv('LLM_RPM', '0'))
+TPM = float(os.getenv('LLM_TPM', '0'))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimació grollera (≈ 4 caràcters per token) per a prompts en català."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def per_minute(self) -> float:
+        return self.rate * 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, per_minute: float, capacity: float | None = None, drain: bool = False):
+        """Canvia el ritme de recàrrega; amb drain=True es buida el cubell (frena de seguida)."""
+        with self._cond:
+            self._refill()
+            self.rate = per_minute / 60.0
+            self.capacity = capacity or per_minute
+            self.tokens = 0.0 if drain else min(self.tokens, self.capacity)
+            self._cond.notify_all()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Bloqueja fins que hi ha amount unitats disponibles; retorna els segons esperats."""
+        waited = 0.0
+        with self._cond:
+            while True:
+                self._refill()
+                # una petició més gran que el cubell espera a tenir-lo ple
+                needed = min(amount, self.capacity)
+                if self.tokens >= needed:
+                    self.tokens -= needed
+                    return waited
+                wait = (needed - self.tokens) / self.rate
+                self._cond.wait(wait)
+                waited += wait
+
+
+# AIMD: cada 429 divideix el ritme de peticions; cada resposta correcta el torna a pujar
+DECREASE_FACTOR = 0.5
+INCREASE_RPM = 2.0
+MIN_RPM = 2.0
+# Sense límit configurat, el primer 429 parteix d'aquest ritme com a mínim (amb poques
+# peticions observades, reduir-ne la meitat deixaria el lot gairebé aturat)
+ADAPTIVE_START_RPM = 30.0
+
+
+class RateLimiter:
+    """Combina un cubell de peticions per minut i un de tokens per minut.
+
+    El ritme de peticions s'adapta (AIMD): en rebre un 429 es redueix a la meitat
+    (partint del ritme observat si no hi havia límit) i cada resposta correcta
+    el fa pujar INCREASE_RPM fins a recuperar el límit configurat. Els 429 de
+    peticions enviades abans de l'última reducció no tornen a reduir: una ràfega
+    de N peticions en curs que fallen alhora compta com un sol senyal.
+    """
+
+    def __init__(self, rpm: float = RPM, tpm: float = TPM):
+        self.max_rpm = rpm if rpm > 0 else None
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._recent: deque[float] = deque()
+        self._ceiling: float | None = None   # ritme previ al primer 429 (si no hi havia límit)
+        self._last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        waited = 0.0
+        requests = self.requests
+        if requests:
+            waited += requests.acquire(1)
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens)
+        now = time.monotonic()
+        with self._lock:
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+        return waited
+
+    def observed_rpm(self) -> float:
+        with self._lock:
+            return float(len(self._recent))
+
+    def on_rate_limited(self, issued_at: float | None = None) -> float:
+        """Decrement multiplicatiu del ritme de peticions.
+
+        issued_at: moment (time.monotonic) en què es va enviar la petició rebutjada;
+        si és anterior a l'última reducció, el ritme ja s'ha ajustat i no es toca.
+        """
+        with self._lock:
+            if self.requests is not None and issued_at is not None and issued_at < self._last_decrease:
+                return self.requests.per_minute
+            self._last_decrease = time.monotonic()
+            current = self.requests.per_minute if self.requests else max(len(self._recent), ADAPTIVE_START_RPM)
+            if self.requests is None and self._ceiling is None:
+                self._ceiling = current
+            new_rpm = max(MIN_RPM, current * DECREASE_FACTOR)
+            # Cubell petit: després d'un 429 no es permeten ràfegues
+            capacity = max(1.0, new_rpm / 10)
+            if self.requests is None:
+                self.requests = TokenBucket(new_rpm, capacity)
+                self.requests.tokens = 0.0
+            else:
+                self.requests.set_rate(new_rpm, capacity, drain=True)
+        return new_rpm
+
+    def on_success(self):
+        """Increment additiu fins al límit configurat (o fins a treure el límit adaptatiu)."""
+        with self._lock:
+            if self.requests is None:
+                return
+            target = self.max_rpm or self._ceiling
+            current = self.requests.per_minute
+            if self.max_rpm and current >= self.max_rpm:
+                return
+            new_rpm = current + INCREASE_RPM
+            if target is not None and new_rpm >= target:
+                if self.max_rpm is None:
+                    # Recuperat el ritme d'abans dels 429: sense límit de nou
+                    self.requests = None
+                    self._ceiling = None
+                    return
+                new_rpm = target
+            # En tornar al límit configurat es recupera la capacitat de ràfega original
+            capacity = self.max_rpm if new_rpm == self.max_rpm else max(1.0, new_rpm / 10)
+            self.requests.set_rate(new_rpm, capacity)
+
+
+_limiter: RateLimiter | None = None
+_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Limitador compartit per tot el procés (configurat amb LLM_RPM i LLM_TPM)."""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -11,15 +11,6 @@ from transcript_corrector import TranscriptCorrector
 
 litellm.drop_params = True
 
-# Patch CrewAI LLM per eliminar el paràmetre 'stop' que alguns models no suporten
-from crewai import LLM as CrewLLM
-_orig_prepare = CrewLLM._prepare_completion_params
-def _patched_prepare(self, messages, tools=None):
-    params = _orig_prepare(self, messages, tools)
-    params.pop('stop', None)
-    return params
-CrewLLM._prepare_completion_params = _patched_prepare
-
 init(autoreset=True)
 
 TYPES_WITH_SUBFOLDER = {'Projectes', 'Proveïdors'}
@@ -295,7 +286,8 @@ class ReunioInteractiva:
                 attendees = attendees + [{'name': speaker}]
                 seen_names.add(speaker)
 
-        processor = DailyProcessor(vocab)
+        meeting_dir = note['path'].parent.parent
+        processor = DailyProcessor(vocab, semantic_memory_path=meeting_dir / 'semantic_memory.json')
         print(f"{Fore.CYAN}Analitzant Daily Scrum...\n")
         result = processor.process(daily_transcript, attendees)
 
@@ -407,18 +399,13 @@ class ReunioInteractiva:
             return False
 
     def _generate_summary(self, transcript: str) -> str:
-        response = litellm.completion(
-            model=os.getenv('LLM_MODELH'),
-            messages=[{
-                "role": "user",
-                "content": (
-                    "Fes un resum breu en català dels punts principals tractats en aquesta reunió. "
-                    "Usa llista de punts. Sense introducció ni conclusió.\n\n"
-                    f"{transcript}"
-                )
-            }]
+        from llm_cache import cached_completion
+        return cached_completion(
+            "Fes un resum breu en català dels punts principals tractats en aquesta reunió. "
+            "Usa llista de punts. Sense introducció ni conclusió.\n\n"
+            f"{transcript}",
+            kind='resum'
         )
-        return response.choices[0].message.content.strip()
 
     def _extract_subtype_from_note(self, path) -> str:
         import yaml
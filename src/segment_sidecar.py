@@ -0,0 +1,65 @@
+"""
+Fitxer de segments al costat de cada nota (<nota>.segments.jsonl)
+La nota només conté el text pla de la transcripció; el sidecar conserva els
+temps i la confiança de cada segment. Les zones dubtoses que fa servir la
+correcció surten de l'índex per paraula (confidence_spans), més precís.
+
+Format: una capçalera JSON i, a continuació, una línia per segment amb una
+llista compacta [inici, fi, avg_logprob, no_speech_prob, text].
+"""
+
+import json
+from pathlib import Path
+
+SIDECAR_SUFFIX = '.segments.jsonl'
+FORMAT_VERSION = 1
+
+
+def sidecar_path(note_path) -> Path:
+    note_path = Path(note_path)
+    return note_path.with_name(note_path.stem + SIDECAR_SUFFIX)
+
+
+def _encode(seg: dict) -> str:
+    return json.dumps([
+        round(seg['start'], 2), round(seg['end'], 2),
+        seg.get('avg_logprob'), seg.get('no_speech_prob'), seg['text'],
+    ], ensure_ascii=False)
+
+
+class SegmentSidecarWriter:
+    """Escriu el sidecar segment a segment (per a transcripcions en streaming)."""
+
+    def __init__(self, note_path, header: dict | None = None):
+        self.path = sidecar_path(note_path)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(dict(header or {}, version=FORMAT_VERSION), ensure_ascii=False) + '\n')
+
+    def append(self, segment: dict):
+        self._file.write(_encode(segment) + '\n')
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_segments(note_path, segments: list[dict], header: dict | None = None) -> Path:
+    with SegmentSidecarWriter(note_path, header) as writer:
+        for seg in segments:
+            writer.append(seg)
+    return writer.path
+
+
+def rename_sidecar(old_note_path, new_note_path):
+    """Mou el sidecar quan es reanomena la nota (marques ~ i *)."""
+    old = sidecar_path(old_note_path)
+    if old.exists():
+        old.rename(sidecar_path(new_note_path))
+
@@ -4,7 +4,10 @@ Prova de transcripció en català amb faster-whisper + model BSC
 Configuració: local, MP3, amb initial_prompt de vocabulari d'empresa
 """
 
+import os
+import json
 import time
+import hashlib
 import sys
 import argparse
 from pathlib import Path
@@ -19,11 +22,24 @@ from pathlib import Path
 #   "BSC-LT/faster-whisper-bsc-large-v3-cat"              ← millor cobertura dialectal
 #   "projecte-aina/whisper-large-v3-ca-3catparla"         ← millor WER en dades TV
 MODEL_ID = "BSC-LT/faster-whisper-large-v3-ca-punctuated-3370h"
+CANDIDATE_MODELS = [
+    "BSC-LT/faster-whisper-large-v3-ca-punctuated-3370h",
+    "BSC-LT/faster-whisper-bsc-large-v3-cat",
+    "projecte-aina/whisper-large-v3-ca-3catparla",
+]
 
 # Dispositiu: "cuda" si tens GPU NVIDIA, "cpu" en cas contrari
 # compute_type: "float16" per a GPU, "int8" per a CPU (més ràpid i menys memòria)
 DEVICE = "cpu"
 COMPUTE_TYPE = "int8"
+BEAM_SIZE = 5
+CPU_THREADS = 0     # 0 = valor per defecte de CTranslate2
+NUM_WORKERS = 1
+
+# Mode lot: nombre de fragments d'àudio que el BatchedInferencePipeline
+# descodifica alhora. Més gran = més ús de CPU/memòria i més throughput.
+BATCH_SIZE = 8
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".wav", ".ogg", ".flac")
 
 # Vocabulari inicial de JCM Technologies
 # Limit: ~224 tokens (~150-170 paraules). S'han prioritzat termes menys freqüents
@@ -40,6 +56,30 @@ Termes: anti-passback, Desfire, Mifare, Wiegand, Vigik, Keyplus4, Polyswitch,
 Watchdog, feature flags, panelat, plurifamiliar, RS485, NFC, TAG, VCP, MVS,
 QCI, QATESTLAB, IDNEO, Prokodis, Marantech."""
 
+# Perfil calibrat per a aquesta màquina (python src/transcription_autotune.py).
+# Si existeix, substitueix COMPUTE_TYPE, CPU_THREADS i BATCH_SIZE.
+PROFILE_PATH = Path(os.getenv(
+    "WHISPER_PROFILE",
+    Path(__file__).resolve().parent.parent / "config" / "whisper_profile.json"
+))
+PROFILE = {}
+if DEVICE == "cpu" and PROFILE_PATH.exists():
+    try:
+        PROFILE = json.loads(PROFILE_PATH.read_text(encoding="utf-8"))
+    except ValueError:
+        PROFILE = {}
+    # Un perfil calibrat en una altra màquina no s'aplica
+    if PROFILE.get("host", {}).get("cpu_count", os.cpu_count()) != os.cpu_count():
+        PROFILE = {}
+    # Els perfils antics amb num_workers > 1 es van triar per throughput de feines concurrents
+    # (amb la meitat de fils): per a una sola transcripció són més lents. Cal recalibrar
+    if PROFILE.get("num_workers", 1) != 1:
+        print(f"⚠️  {PROFILE_PATH.name} és d'una versió antiga del calibratge: no s'aplica (torna a calibrar)")
+        PROFILE = {}
+    COMPUTE_TYPE = PROFILE.get("compute_type", COMPUTE_TYPE)
+    CPU_THREADS = PROFILE.get("cpu_threads", CPU_THREADS)
+    BATCH_SIZE = PROFILE.get("batch_size", BATCH_SIZE)
+
 # ─────────────────────────────────────────────
 # PROGRAMA
 # ─────────────────────────────────────────────
@@ -55,69 +95,295 @@ def check_dependencies():
         return False
 
 
-def transcribe(audio_path: str, use_prompt: bool = True) -> dict:
+def load_model():
+    """
+    Carrega el model BSC una sola vegada.
+
+    Returns:
+        (model, segons de càrrega)
+    """
+    from faster_whisper import WhisperModel
+
+    print("⏳ Carregant model (primera vegada pot trigar uns minuts)...")
+    t0 = time.time()
+    model = WhisperModel(MODEL_ID, device=DEVICE, compute_type=COMPUTE_TYPE,
+                         cpu_threads=CPU_THREADS, num_workers=NUM_WORKERS)
+    t_load = time.time() - t0
+    print(f"✅ Model carregat en {t_load:.1f}s\n")
+    return model, t_load
+
+
+def segment_dict(seg) -> dict:
+    """Converteix un Segment de faster-whisper en el dict que fan servir la resta de mòduls."""
+    d = {
+        "start": seg.start,
+        "end": seg.end,
+        "text": seg.text.strip(),
+        "avg_logprob": round(seg.avg_logprob, 4),
+        "no_speech_prob": round(seg.no_speech_prob, 4),
+    }
+    if seg.words:
+        # [inici, fi, probabilitat, paraula]: format compacte per a confidence_spans
+        d["words"] = [[round(w.start, 2), round(w.end, 2), round(w.probability, 3), w.word.strip()]
+                      for w in seg.words]
+    return d
+
+
+def iter_segments(audio_path, use_prompt: bool = True, model=None, batch_size: int = 0,
+                  clip_start: float = 0.0, prompt: str | None = None, hotwords: str | None = None,
+                  word_probs: bool = False):
+    """
+    Transcriu en streaming: retorna els segments a mesura que es descodifiquen.
+
+    No acumula res en memòria, de manera que es pot fer servir per
+    gravacions de qualsevol durada. Amb clip_start > 0 es comença a
+    transcriure a partir d'aquest segon (per reprendre una transcripció).
+    prompt/hotwords substitueixen INITIAL_PROMPT (p. ex. generats amb PromptBuilder).
+    audio_path pot ser una ruta o un array float32 a 16 kHz ja descodificat.
+    Amb word_probs=True cada segment inclou 'words' amb la probabilitat de cada paraula.
+
+    Returns:
+        (generador de dicts {'start', 'end', 'text', 'avg_logprob', 'no_speech_prob'},
+         info de faster-whisper)
+        info.duration permet calcular el progrés com seg['end'] / info.duration
+    """
+    if model is None:
+        model, _ = load_model()
+
+    prompt = (prompt or INITIAL_PROMPT) if use_prompt else None
+    batch_kwargs = {}
+    if hotwords and use_prompt:
+        batch_kwargs["hotwords"] = hotwords
+    pipeline = model
+    if batch_size:
+        from faster_whisper import BatchedInferencePipeline
+        pipeline = BatchedInferencePipeline(model=model)
+        batch_kwargs["batch_size"] = batch_size
+    elif clip_start > 0:
+        batch_kwargs["clip_timestamps"] = [clip_start]
+    segments_gen, info = pipeline.transcribe(
+        audio_path,
+        language="ca",
+        beam_size=BEAM_SIZE,
+        initial_prompt=prompt,
+        word_timestamps=word_probs,
+        **batch_kwargs,
+    )
+
+    def _segments():
+        for seg in segments_gen:
+            yield segment_dict(seg)
+
+    return _segments(), info
+
+
+def transcribe(audio_path: str, use_prompt: bool = True, model=None, batch_size: int = 0,
+               use_cache: bool = True, checkpoint: bool = False, resume: bool = False,
+               prompt: str | None = None, hotwords: str | None = None, word_probs: bool = False) -> dict:
     """
     Transcriu un fitxer MP3 amb el model BSC.
     
     Args:
         audio_path: Ruta al fitxer MP3
         use_prompt: Si True, aplica l'initial_prompt configurat
+        model: WhisperModel ja carregat (si és None, se'n carrega un de nou)
+        batch_size: Si > 0, usa el BatchedInferencePipeline amb aquesta mida de lot
+        use_cache: Si True, reutilitza/desa el resultat a la memòria cau de transcripcions
+        checkpoint: Si True, desa periòdicament els segments fets a <àudio>.checkpoint.jsonl
+            (només la línia d'ordres l'activa: el fitxer queda al costat de l'àudio)
+        resume: Si True, continua des de l'últim checkpoint en lloc de començar de zero
+        prompt: initial_prompt a usar en lloc d'INITIAL_PROMPT
+        hotwords: termes a reforçar (paràmetre hotwords de faster-whisper)
+        word_probs: Si True, conserva la probabilitat de cada paraula (per a l'índex de trams dubtosos)
     
     Returns:
-        Dict amb 'text', 'segments', 'duration', 'elapsed', 'language'
+        Dict amb 'text', 'segments', 'duration', 'elapsed', 'rtf', 'language', 'cached'
     """
-    from faster_whisper import WhisperModel
-
     print(f"\n{'='*60}")
     print(f"Model:    {MODEL_ID}")
-    print(f"Dispositiu: {DEVICE} ({COMPUTE_TYPE})")
+    print(f"Dispositiu: {DEVICE} ({COMPUTE_TYPE}{', perfil calibrat' if PROFILE else ''})")
     print(f"Fitxer:   {audio_path}")
     print(f"Prompt:   {'Sí' if use_prompt else 'No'}")
     print(f"{'='*60}\n")
 
-    # Càrrega del model
-    print("⏳ Carregant model (primera vegada pot trigar uns minuts)...")
-    t0 = time.time()
-    model = WhisperModel(MODEL_ID, device=DEVICE, compute_type=COMPUTE_TYPE)
-    t_load = time.time() - t0
-    print(f"✅ Model carregat en {t_load:.1f}s\n")
+    # Memòria cau: si ja s'ha transcrit aquest àudio amb la mateixa configuració
+    cache = cache_key = audio_hash = None
+    if use_cache:
+        from transcription_cache import TranscriptionCache, file_sha256
+        t0 = time.time()
+        cache = TranscriptionCache()
+        audio_hash = file_sha256(audio_path)
+        cache_key = cache.make_key(
+            audio_hash, MODEL_ID, COMPUTE_TYPE, BEAM_SIZE,
+            f"{prompt or INITIAL_PROMPT}|{hotwords or ''}" if use_prompt else None,
+            word_probs=word_probs, batch_size=batch_size,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            elapsed = time.time() - t0
+            print("⚡ Transcripció recuperada de la memòria cau\n")
+            return {
+                "text": " ".join(s["text"] for s in cached["segments"]),
+                "segments": cached["segments"],
+                "duration": cached["duration"],
+                "elapsed": elapsed,
+                "rtf": elapsed / cached["duration"] if cached["duration"] else 0.0,
+                "language": cached["language"],
+                "language_prob": cached["language_prob"],
+                "cached": True,
+            }
+
+    # Càrrega del model (només si no se n'ha passat un de ja carregat)
+    if model is None:
+        model, _ = load_model()
+
+    # Checkpoint: segments ja fets d'una execució interrompuda
+    ckpt = None
+    segments = []
+    if checkpoint or resume:
+        from transcription_checkpoint import TranscriptionCheckpoint
+        ckpt = TranscriptionCheckpoint(audio_path, {
+            "model": MODEL_ID, "compute_type": COMPUTE_TYPE,
+            "beam_size": BEAM_SIZE,
+            "prompt": hashlib.sha256(f"{prompt or INITIAL_PROMPT}|{hotwords or ''}".encode()).hexdigest()
+            if use_prompt else None,
+            "word_probs": word_probs,
+        })
+        if resume:
+            segments = ckpt.load()
+    offset = segments[-1]["end"] if segments else 0.0
+    if offset:
+        print(f"↩️  Reprenent des de {offset:.1f}s ({len(segments)} segments recuperats)")
+        batch_size = 0   # el pipeline per lots no admet clip_timestamps
 
     # Transcripció
     print("🎙️  Transcrivint...")
     t1 = time.time()
 
-    prompt = INITIAL_PROMPT if use_prompt else None
-    segments_gen, info = model.transcribe(
-        audio_path,
-        language="ca",
-        beam_size=5,
-        initial_prompt=prompt,
-        word_timestamps=False,
-    )
+    # Àudio ja descodificat (mmap del .npy a la memòria cau) en lloc de tornar a passar per ffmpeg.
+    # Només es desa una còpia descodificada si la transcripció es pot reprendre més tard
+    audio = audio_path
+    if use_cache:
+        from audio_cache import decoded_audio
+        audio = decoded_audio(audio_path, audio_hash, persist=checkpoint or resume)
+
+    segments_gen, info = iter_segments(audio, use_prompt=use_prompt, model=model,
+                                       batch_size=batch_size, clip_start=offset,
+                                       prompt=prompt, hotwords=hotwords, word_probs=word_probs)
 
     # Iterar segments (generador)
-    segments = []
-    full_text_parts = []
-    for seg in segments_gen:
-        segments.append({
-            "start": seg.start,
-            "end": seg.end,
-            "text": seg.text.strip(),
-        })
-        full_text_parts.append(seg.text.strip())
+    full_text_parts = [seg["text"] for seg in segments]
+    if ckpt:
+        ckpt.open(segments)
+    try:
+        for seg in segments_gen:
+            segments.append(seg)
+            full_text_parts.append(seg["text"])
+            if ckpt:
+                ckpt.append(seg)
+    finally:
+        if ckpt:
+            ckpt.close()
 
     t_transcribe = time.time() - t1
     full_text = " ".join(full_text_parts)
     audio_duration = info.duration
 
-    return {
+    result = {
         "text": full_text,
         "segments": segments,
         "duration": audio_duration,
         "elapsed": t_transcribe,
+        "rtf": t_transcribe / audio_duration if audio_duration else 0.0,
         "language": info.language,
         "language_prob": info.language_probability,
+        "cached": False,
     }
+    if cache is not None:
+        cache.put(cache_key, result, audio_name=Path(audio_path).name)
+    if ckpt:
+        ckpt.remove()
+    return result
+
+
+def build_prompt(vocab_path: Path | None = None, meeting_dir: Path | None = None) -> tuple[str | None, str | None]:
+    """
+    Genera initial_prompt i hotwords des de zConfig/Vocabulari.md i la memòria de la sèrie.
+
+    Si no es troba el vocabulari, retorna (None, None) i s'usa INITIAL_PROMPT.
+    """
+    if vocab_path is None:
+        vault = os.getenv("OBSIDIAN_VAULT_PATH")
+        if not vault:
+            return None, None
+        vocab_path = Path(vault).expanduser() / "Reunions" / "zConfig" / "Vocabulari.md"
+    if not Path(vocab_path).exists():
+        return None, None
+
+    from prompt_builder import PromptBuilder
+    semantic_memory_path = Path(meeting_dir) / "semantic_memory.json" if meeting_dir else None
+    return PromptBuilder(vocab_path, semantic_memory_path).build()
+
+
+def collect_audio_files(paths: list[str]) -> list[Path]:
+    """Expandeix directoris i retorna la llista ordenada de fitxers d'àudio."""
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(f for f in p.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS))
+        elif p.exists():
+            files.append(p)
+        else:
+            print(f"ERROR: No es troba el fitxer: {p}")
+    return files
+
+
+def transcribe_batch(audio_paths: list[Path], use_prompt: bool = True, batch_size: int = BATCH_SIZE,
+                     use_cache: bool = True, prompt: str | None = None, hotwords: str | None = None,
+                     word_probs: bool = False, checkpoint: bool = False,
+                     resume: bool = False) -> list[tuple[Path, dict | None]]:
+    """
+    Transcriu molts fitxers compartint un sol model i el pipeline per lots.
+
+    word_probs, checkpoint i resume s'apliquen a cada fitxer com a transcribe().
+
+    Returns:
+        Llista de (fitxer, resultat); resultat és None si el fitxer ha fallat
+    """
+    model, _ = load_model()
+    results = []
+    for i, audio in enumerate(audio_paths, 1):
+        print(f"[{i}/{len(audio_paths)}] {audio.name}")
+        try:
+            results.append((audio, transcribe(str(audio), use_prompt=use_prompt, model=model,
+                                              batch_size=batch_size, use_cache=use_cache,
+                                              prompt=prompt, hotwords=hotwords, word_probs=word_probs,
+                                              checkpoint=checkpoint, resume=resume)))
+        except Exception as e:
+            print(f"❌ Error transcrivint {audio.name}: {e}")
+            results.append((audio, None))
+    return results
+
+
+def print_batch_summary(results: list[tuple[Path, dict | None]]):
+    """Imprimeix una taula resum amb durada, temps i factor de velocitat per fitxer."""
+    print(f"\n{'─'*72}")
+    print(f"📋 Resum del lot ({len(results)} fitxers)")
+    print(f"{'─'*72}")
+    print(f"{'Fitxer':<36} {'Durada':>9} {'Temps':>9} {'Factor':>9}")
+    total_duration = total_elapsed = 0.0
+    for audio, result in results:
+        name = audio.name if len(audio.name) <= 36 else audio.name[:33] + "..."
+        if result is None:
+            print(f"{name:<36} {'error':>9}")
+            continue
+        total_duration += result["duration"]
+        total_elapsed += result["elapsed"]
+        factor = result["duration"] / result["elapsed"] if result["elapsed"] else 0.0
+        print(f"{name:<36} {result['duration']:8.1f}s {result['elapsed']:8.1f}s {factor:8.1f}x")
+    if total_elapsed:
+        print(f"{'─'*72}")
+        print(f"{'TOTAL':<36} {total_duration:8.1f}s {total_elapsed:8.1f}s {total_duration/total_elapsed:8.1f}x")
 
 
 def print_results(result: dict, label: str = "Resultat"):
@@ -127,8 +393,9 @@ def print_results(result: dict, label: str = "Resultat"):
     print(f"{'─'*60}")
     print(f"Idioma detectat:  {result['language']} (confiança: {result['language_prob']:.1%})")
     print(f"Durada àudio:     {result['duration']:.1f}s ({result['duration']/60:.1f} min)")
-    print(f"Temps transcripció: {result['elapsed']:.1f}s")
+    print(f"Temps transcripció: {result['elapsed']:.1f}s{' (memòria cau)' if result.get('cached') else ''}")
     print(f"Factor velocitat: {result['duration']/result['elapsed']:.1f}x temps real")
+    print(f"RTF:              {result['rtf']:.3f}")
     print(f"\n🗒️  TRANSCRIPCIÓ COMPLETA:\n")
     print(result["text"])
     print(f"\n📌 Segments ({len(result['segments'])} total):")
@@ -139,10 +406,17 @@ def print_results(result: dict, label: str = "Resultat"):
 
 
 def save_transcript(result: dict, output_path: str):
-    """Guarda la transcripció en un fitxer de text."""
+    """Guarda la transcripció en un fitxer de text (i els segments a <sortida>.segments.jsonl)."""
+    from segment_sidecar import write_segments
+    from confidence_spans import extract_spans, write_spans
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(result["text"])
+    sidecar = write_segments(output_path, result["segments"], {"model": MODEL_ID, "duration": result["duration"]})
     print(f"\n💾 Transcripció guardada a: {output_path}")
+    print(f"💾 Segments: {sidecar}")
+    if any("words" in seg for seg in result["segments"]):
+        spans = extract_spans(result["segments"])
+        print(f"💾 Trams de baixa confiança ({len(spans)}): {write_spans(output_path, spans)}")
 
 
 def main():
@@ -151,7 +425,8 @@ def main():
     )
     parser.add_argument(
         "audio",
-        help="Ruta al fitxer MP3 a transcriure"
+        nargs="+",
+        help="Ruta al fitxer MP3 a transcriure (o diversos fitxers / un directori per al mode lot)"
     )
     parser.add_argument(
         "--sense-prompt",
@@ -161,21 +436,112 @@ def main():
     parser.add_argument(
         "--output", "-o",
         default=None,
-        help="Fitxer on guardar la transcripció (opcional)"
+        help="Fitxer on guardar la transcripció (opcional; en mode lot, directori de sortida)"
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        nargs="?",
+        const=BATCH_SIZE,
+        default=0,
+        help=f"Usa el pipeline per lots (mida per defecte {BATCH_SIZE}); automàtic amb diversos fitxers"
+    )
+    parser.add_argument(
+        "--paralel",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Talla l'àudio als silencis i transcriu els fragments en N processos (gravacions llargues)"
+    )
+    parser.add_argument(
+        "--sense-cache",
+        action="store_true",
+        help="No llegeix ni desa la memòria cau de transcripcions"
+    )
+    parser.add_argument(
+        "--vocabulari",
+        default=None,
+        help="Vocabulari.md per generar el prompt (per defecte, el del vault d'OBSIDIAN_VAULT_PATH)"
+    )
+    parser.add_argument(
+        "--serie",
+        default=None,
+        help="Directori de la sèrie de reunions (amb semantic_memory.json) per prioritzar-ne els termes"
+    )
+    parser.add_argument(
+        "--reprendre",
+        action="store_true",
+        help="Continua una transcripció interrompuda des de l'últim checkpoint"
+    )
+    parser.add_argument(
+        "--paraules",
+        action="store_true",
+        help="Conserva la probabilitat de cada paraula i desa l'índex de trams de baixa confiança"
+    )
+    parser.add_argument(
+        "--servidor",
+        action="store_true",
+        help="Envia la feina al servidor de transcripció (transcription_server.py) en lloc de carregar el model"
     )
     args = parser.parse_args()
 
-    # Comprovacions prèvies
-    if not check_dependencies():
+    audio_files = collect_audio_files(args.audio)
+    if not audio_files:
         sys.exit(1)
 
-    if not Path(args.audio).exists():
-        print(f"ERROR: No es troba el fitxer: {args.audio}")
-        sys.exit(1)
+    use_prompt = not args.sense_prompt
+    prompt = hotwords = None
+    if use_prompt:
+        prompt, hotwords = build_prompt(
+            Path(args.vocabulari) if args.vocabulari else None,
+            Path(args.serie) if args.serie else None
+        )
+        if prompt:
+            print(f"📝 Prompt generat des del vocabulari ({len(prompt.split())} paraules)")
+            if hotwords:
+                print(f"🔥 Hotwords: {hotwords}")
+
+    # Mode lot: un sol model per a tots els fitxers
+    if len(audio_files) > 1 or args.batch:
+        if args.servidor or args.paralel:
+            parser.error("--servidor i --paralel transcriuen un sol fitxer: no es poden combinar amb el mode lot")
+        if not check_dependencies():
+            sys.exit(1)
+        results = transcribe_batch(audio_files, use_prompt=use_prompt, batch_size=args.batch or BATCH_SIZE,
+                                   use_cache=not args.sense_cache, prompt=prompt, hotwords=hotwords,
+                                   word_probs=args.paraules, checkpoint=True, resume=args.reprendre)
+        out_dir = Path(args.output) if args.output else None
+        if out_dir:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        for audio, result in results:
+            if result is not None:
+                name = audio.stem + "_transcripcio.txt"
+                save_transcript(result, str(out_dir / name if out_dir else name))
+        print_batch_summary(results)
+        return
+
+    audio = audio_files[0]
+    if (args.servidor or args.paralel) and (args.reprendre or args.paraules):
+        parser.error("--reprendre i --paraules no estan disponibles amb --servidor ni --paralel")
 
     # Transcripció
-    use_prompt = not args.sense_prompt
-    result = transcribe(args.audio, use_prompt=use_prompt)
+    if args.servidor:
+        from transcription_server import transcribe_remote
+        result = transcribe_remote(str(audio.resolve()), use_prompt=use_prompt,
+                                   prompt=prompt, hotwords=hotwords)
+    elif args.paralel:
+        if not check_dependencies():
+            sys.exit(1)
+        from parallel_transcriber import transcribe_parallel
+        result = transcribe_parallel(str(audio), use_prompt=use_prompt, replicas=args.paralel,
+                                     prompt=prompt, hotwords=hotwords)
+    else:
+        # Comprovacions prèvies
+        if not check_dependencies():
+            sys.exit(1)
+        result = transcribe(str(audio), use_prompt=use_prompt, use_cache=not args.sense_cache,
+                            checkpoint=True, resume=args.reprendre, prompt=prompt, hotwords=hotwords,
+                            word_probs=args.paraules)
 
     label = "Transcripció AMB initial_prompt" if use_prompt else "Transcripció SENSE initial_prompt"
     print_results(result, label=label)
@@ -185,7 +551,7 @@ def main():
         save_transcript(result, args.output)
     else:
         # Per defecte, guarda al costat de l'àudio
-        output_default = Path(args.audio).stem + "_transcripcio.txt"
+        output_default = audio.stem + "_transcripcio.txt"
         save_transcript(result, output_default)
 
 
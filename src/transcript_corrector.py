@@ -1,43 +1,212 @@
 import os
 import re
+import bisect
 import time
+import threading
 from pathlib import Path
-from crewai import Agent, Task, Crew, LLM
-from json_repair import repair_json
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+import alias_store
+from correction_record import CorrectionRecord, resolve_offsets, apply_corrections
+from json_stream import JSONArrayStream
+from llm_completion import CompletionLLM, Role
+from transcript_index import TranscriptIndex
+from vocabulary_selector import VocabularySelector, format_vocab
+
+# Transcripcions més llargues es revisen per finestres solapades en paral·lel
+WINDOW_CHARS = 12000
+WINDOW_OVERLAP_CHARS = 600
+MAX_WINDOW_WORKERS = 4
+REFERENCE_MAX_CHARS = 6000
+
+# Crides de detecció simultànies en tot el procés. El comparteixen les finestres
+# d'una nota i les notes que es revisen en paral·lel (BatchCorrectionDetectWorker):
+# 3 notes × 4 finestres no han de ser 12 crides alhora
+_call_slots = threading.BoundedSemaphore(MAX_WINDOW_WORKERS)
+
+
+class Correction(BaseModel):
+    # additionalProperties: false només a l'esquema (ho exigeix la sortida estricta);
+    # en validar, els camps de més s'ignoren
+    model_config = ConfigDict(json_schema_extra={'additionalProperties': False})
+    original: str
+    correccio: str
+    motiu: str
+    frase: str
+    confiança: float
+
+
+class CorrectionList(BaseModel):
+    model_config = ConfigDict(json_schema_extra={'additionalProperties': False})
+    correccions: list[Correction]
+
+
+CORRECTOR_ROLE = Role(
+    role="Corrector de transcripcions",
+    goal="Detectar paraules mal transcrites usant el vocabulari de l'empresa",
+    backstory="Expert en correcció de transcripcions automàtiques en català per JCM Technologies.",
+)
+
+
+def split_windows(text: str, window_chars: int = WINDOW_CHARS,
+                  overlap_chars: int = WINDOW_OVERLAP_CHARS) -> list[tuple[int, int]]:
+    """Divideix el text en finestres (inici, fi) tallant en canvis de línia (torns) o final de frase.
+
+    Cada finestra comença com a mínim overlap_chars abans del final de l'anterior,
+    perquè un error a la frontera quedi sencer en alguna de les dues.
+    """
+    if len(text) <= window_chars:
+        return [(0, len(text))]
+    # Límits preferits: canvis de línia (torns de paraula); si no n'hi ha, finals de frase
+    line_ends = [m.end() for m in re.finditer(r'\n+', text)]
+    sentence_ends = [m.end() for m in re.finditer(r'[.!?…]+\s+', text)]
+
+    def _last_boundary(lo, hi):
+        for boundaries in (line_ends, sentence_ends):
+            i = bisect.bisect_right(boundaries, hi)
+            if i and boundaries[i - 1] > lo:
+                return boundaries[i - 1]
+        space = text.rfind(' ', lo, hi)
+        return space + 1 if space > lo else hi
+
+    windows = []
+    start = 0
+    while start < len(text):
+        if len(text) - start <= window_chars:
+            windows.append((start, len(text)))
+            break
+        end = _last_boundary(start + window_chars // 2, start + window_chars)
+        windows.append((start, end))
+        start = max(_last_boundary(end - overlap_chars - window_chars // 4, end - overlap_chars), start + 1)
+    return windows
+
+
+def merge_corrections(groups: list[list[dict]]) -> list[dict]:
+    """Fusiona les correccions de diverses finestres: una per (original, correcció), la de més confiança."""
+    merged: dict[tuple, dict] = {}
+    for corrections in groups:
+        for c in corrections:
+            if not isinstance(c, dict) or 'original' not in c or 'correccio' not in c:
+                continue
+            key = (c['original'], c['correccio'])
+            prev = merged.get(key)
+            if prev is None or float(c.get('confiança', 0) or 0) > float(prev.get('confiança', 0) or 0):
+                merged[key] = c
+    return list(merged.values())
+
+
+def new_records(transcript: str, corrections: list[dict], index: TranscriptIndex) -> list[CorrectionRecord]:
+    """Correccions definitives, vinguin del LLM o de l'índex fonètic.
+
+    Es descarten les que proposen un terme que ja és a la transcripció i, un cop
+    resoltes les posicions (un sol cop, sobre el text que es revisarà i s'aplicarà),
+    les que no hi tenen cap aparició aplicable: l'original només surt dins d'una
+    paraula més llarga o dins del terme correcte.
+    """
+    corrections = [c for c in corrections if not index.contains(c['correccio'])]
+    records = resolve_offsets(transcript, corrections, index)
+    return [r for r in records if r.ocurrencies]
 
 
 class TranscriptCorrector:
     def __init__(self, vocab: dict, semantic_memory_path: Path = None, model: str = None,
-                 threshold_auto: float = 0.85):
+                 threshold_auto: float = 0.85, window_chars: int = WINDOW_CHARS,
+                 max_workers: int = MAX_WINDOW_WORKERS, phonetic_mode: str = None, vocab_budget: int = None):
         self.vocab = vocab
         self.semantic_memory_path = Path(semantic_memory_path) if semantic_memory_path else None
-        self.llm = LLM(model=model or os.getenv('LLM_MODELH'), drop_params=True)
+        # Al prompt només hi van els termes més rellevants per a cada transcripció (vocab_budget tokens)
+        self.vocab_selector = VocabularySelector(vocab, self.semantic_memory_path, token_budget=vocab_budget)
+        self.llm = CompletionLLM(model)
         self.threshold_auto = threshold_auto
+        self.window_chars = window_chars   # 0 = sempre en una sola crida
+        self.window_overlap = WINDOW_OVERLAP_CHARS
+        self.max_workers = max_workers
+        self.window_stats: list[dict] = []   # latència per finestra de l'última detecció
+        # Índex fonètic local: None (només LLM), 'offline' (sense LLM) o 'prefiltre'
+        # (els candidats segurs s'accepten i els dubtosos van al LLM)
+        self.phonetic_mode = phonetic_mode
 
-    def detect(self, transcript: str, reference_transcript: str = None, semantic_context=None) -> tuple[str, list[dict]]:
+    def detect(self, transcript: str, reference_transcript: str = None, semantic_context=None,
+               spans: list[dict] = None, on_correction=None) -> tuple[str, list[CorrectionRecord]]:
         """Aplica correccions memoritzades i detecta nous errors amb LLM.
 
+        Si es passen els trams de baixa confiança de Whisper (confidence_spans),
+        només s'envien al LLM aquests trams amb el seu context en lloc de tota
+        la transcripció. Una llista buida vol dir que no hi ha res dubtós.
+        Si no, les transcripcions de més de window_chars caràcters es revisen
+        per finestres solapades en paral·lel (vegeu split_windows).
+        Amb phonetic_mode, l'índex fonètic del vocabulari (phonetic_index) proposa
+        candidats localment: en mode 'offline' no es crida el LLM i en mode
+        'prefiltre' se li envien els candidats dubtosos (i els trams, si n'hi ha);
+        sense cap candidat dubtós, la revisió és la normal.
+
+        La resposta del LLM es llegeix en streaming: si es passa on_correction, es
+        crida (des del fil que fa la crida) amb cada correcció nova tan bon punt
+        arriba, ja filtrada i sense repetides. La llista retornada és la definitiva.
+
         Returns:
             (transcripció amb memoritzades aplicades, llista de correccions noves)
-            Cada correcció: {"original", "correccio", "motiu", "frase"}
+            Cada correcció és un CorrectionRecord ({"original", "correccio", "motiu",
+            "frase", "confiança"} i les posicions de l'original sobre aquesta transcripció)
         """
-        # 1. Aplicar correccions memoritzades automàticament
+        # 1. Aplicar correccions memoritzades automàticament (una sola passada)
         # Globals (Canvis-Memoritzats.md) → s'apliquen a totes les transcripcions
-        global_memorized = self._load_global_memorized()
-        if global_memorized:
-            for original, correccio in global_memorized.items():
-                if original in transcript:
-                    transcript = transcript.replace(original, correccio)
-
-        # Locals (semantic_memory.json) → s'apliquen només a aquesta sèrie
-        local_memorized = self._load_local_memorized()
-        if local_memorized:
-            for original, correccio in local_memorized.items():
-                if original in transcript:
-                    transcript = transcript.replace(original, correccio)
+        # Locals (semantic_memory.json) → només a aquesta sèrie; tenen prioritat sobre les globals
+        transcript = self._memorized_matcher().apply(transcript)
+        # Índex de paraules del text definitiu: el comparteixen el filtre, les posicions i on_correction
+        index = TranscriptIndex(transcript)
+        emit = self._emitter(index, on_correction)
 
         # 2. LLM detecta nous errors
-        vocab_text = self._format_vocab()
+        # La regla «el terme correcte ja hi és» del prompt es torna a comprovar sobre la
+        # transcripció sencera: cada finestra o fragment només en veu una part
+        def emit_new(c: dict):
+            if not index.contains(c['correccio']):
+                emit(c)
+
+        self.window_stats = []
+        transcript_section = None   # None = transcripció sencera (per finestres si és llarga)
+        sure = []
+        doubtful = []
+        if self.phonetic_mode:
+            from phonetic_index import index_for, SURE_SCORE
+            candidates = index_for(self.vocab).scan(transcript)
+            if self.phonetic_mode == 'offline':
+                for c in candidates:
+                    emit_new(c)
+                return transcript, new_records(transcript, candidates, index)
+            sure = [c for c in candidates if c['confiança'] >= SURE_SCORE]
+            doubtful = [c for c in candidates if c['confiança'] < SURE_SCORE]
+            for c in sure:
+                emit_new(c)
+        # Sense candidats dubtosos el prefiltre no decideix què revisar: s'hi afegeixen els trams de
+        # baixa confiança o, si la nota no en té índex, es revisa la transcripció sencera
+        if spans is not None and not spans and not doubtful:
+            return transcript, new_records(transcript, sure, index)
+        if doubtful or spans:
+            from confidence_spans import locate_spans, build_excerpts
+            span_offsets = locate_spans(transcript, spans) if spans else []
+            excerpts = build_excerpts(transcript, sorted([(c['inici'], c['fi']) for c in doubtful] + span_offsets))
+            # Si cap tram no es troba (nota editada a mà), es revisa el text sencer
+            if excerpts:
+                fragments = '\n'.join(f"[{i}] {e}" for i, e in enumerate(excerpts, 1))
+                if not span_offsets:
+                    header = "FRAGMENTS DE LA TRANSCRIPCIÓ:"
+                elif not doubtful:
+                    header = ("FRAGMENTS DE LA TRANSCRIPCIÓ (només els trams on el reconeixement de veu "
+                              "tenia poca confiança, amb el seu context; la resta del text és fiable):")
+                else:
+                    header = ("FRAGMENTS DE LA TRANSCRIPCIÓ (al voltant dels candidats i dels trams on el "
+                              "reconeixement de veu tenia poca confiança; la resta del text és fiable):")
+                transcript_section = f"{header}\n{fragments}"
+                if doubtful:
+                    hints = '\n'.join(f"- «{c['original']}» → {c['correccio']}?" for c in doubtful)
+                    transcript_section = (
+                        "CANDIDATS DETECTATS PER SIMILITUD FONÈTICA (confirma'ls o descarta'ls segons el context):\n"
+                        f"{hints}\n\n{transcript_section}"
+                    )
+
+        vocab_text = self._format_vocab(transcript, index)
 
         semantic_section = ''
         if semantic_context and (semantic_context.relevant_projects or semantic_context.topic_context or semantic_context.likely_terms):
@@ -55,16 +224,87 @@ EXEMPLE DE TRANSCRIPCIÓ JA CORREGIDA (reunió anterior de la mateixa sèrie, us
 {reference_transcript}
 """
 
-        agent = Agent(
-            role="Corrector de transcripcions",
-            goal="Detectar paraules mal transcrites usant el vocabulari de l'empresa",
-            backstory="Expert en correcció de transcripcions automàtiques en català per JCM Technologies.",
-            llm=self.llm,
-            verbose=False
-        )
+        if os.getenv('GENERA_LOG', '').upper() == 'TRUE':
+            from datetime import datetime
+            separator = '-' * 90
+            log_entry = (
+                f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"{separator}\n"
+                f"Vocabulari:\n{vocab_text}\n\n"
+                f"Semàntic:\n{semantic_section}\n\n"
+                f"Referència:\n{ref_section}\n"
+                f"{separator}\n"
+            )
+            log_path = Path(__file__).resolve().parent.parent / 'data' / 'log-correccio-transcripcio.txt'
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(log_entry)
 
-        task = Task(
-            description=f"""
+        if transcript_section is None and self.window_chars and len(transcript) > self.window_chars:
+            corrections = self._detect_windowed(transcript, vocab_text, semantic_section, ref_section,
+                                                emit_new)
+        else:
+            if transcript_section is None:
+                transcript_section = f"TRANSCRIPCIÓ:\n{transcript}"
+            corrections = self._run_detection(transcript_section, vocab_text, semantic_section, ref_section,
+                                              emit_new)
+        if sure:
+            corrections = merge_corrections([sure, corrections])
+        return transcript, new_records(transcript, corrections, index)
+
+    def _emitter(self, index: TranscriptIndex, on_correction):
+        """Embolcall d'on_correction: aplica el filtre de paraula sencera i descarta repetides.
+
+        Les finestres en paral·lel el criden des de fils diferents.
+        """
+        seen = set()
+        lock = threading.Lock()
+
+        def emit(c: dict):
+            if on_correction is None:
+                return
+            if not index.uncovered(c['original'], c['correccio']):
+                return
+            with lock:
+                key = (c['original'], c['correccio'])
+                if key in seen:
+                    return
+                seen.add(key)
+            on_correction(c)
+
+        return emit
+
+    def _detect_windowed(self, transcript: str, vocab_text: str, semantic_section: str,
+                         ref_section: str, emit=None) -> list[dict]:
+        """Detecta per finestres solapades en paral·lel i fusiona les correccions."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        windows = split_windows(transcript, self.window_chars, self.window_overlap)
+        # La referència sencera a cada finestra multiplicaria els tokens: se n'envia l'inici
+        if len(ref_section) > REFERENCE_MAX_CHARS:
+            ref_section = ref_section[:REFERENCE_MAX_CHARS].rsplit(' ', 1)[0] + ' [...]\n'
+
+        def _one(item):
+            i, (start, end) = item
+            section = (f"TRANSCRIPCIÓ (fragment {i + 1} de {len(windows)}; "
+                       f"els fragments se solapen lleugerament):\n{transcript[start:end]}")
+            t0 = time.time()
+            found = self._run_detection(section, vocab_text, semantic_section, ref_section, emit)
+            return {'window': i + 1, 'chars': end - start, 'elapsed': time.time() - t0,
+                    'corrections': len(found)}, found
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(windows))) as pool:
+            results = list(pool.map(_one, enumerate(windows)))
+
+        self.window_stats = [stats for stats, _ in results]
+        for st in self.window_stats:
+            print(f"[TranscriptCorrector] finestra {st['window']}/{len(windows)}: "
+                  f"{st['chars']} caràcters, {st['elapsed']:.1f}s, {st['corrections']} correccions")
+        return merge_corrections([found for _, found in results])
+
+    def _detection_prompt(self, transcript_section: str, vocab_text: str, semantic_section: str,
+                          ref_section: str) -> str:
+        return f"""
 Ets un corrector especialitzat en transcripcions automàtiques per veu (ASR) de reunions tècniques en català.
 
 El sistema ASR comet errors fonètics: transcriu paraules comunes del català o castellà quan el parlant deia un terme tècnic, nom de producte o nom de persona del vocabulari de l'empresa. Pot passar que "HONOADOOR" es transcrigui com "congeladors", "HONOA" com "onea", "KAIMAI" com "queimei", o noms de persona com paraules comunes.
@@ -74,8 +314,7 @@ TASCA: Revisa la transcripció i detecta TOTES les paraules o frases que probabl
 VOCABULARI DE L'EMPRESA:
 {vocab_text}
 {semantic_section}
-{ref_section}TRANSCRIPCIÓ:
-{transcript}
+{ref_section}{transcript_section}
 
 Per cada possible error, indica:
 - "original": el text erroni tal com apareix a la transcripció
@@ -91,106 +330,63 @@ Per cada possible error, indica:
 IMPORTANT: No proposis cap correcció si el terme correcte del vocabulari ja apareix literalment a la transcripció. Per exemple, si "OTC" ja és al text, no cal proposar canviar "TC" per "OTC".
 IMPORTANT: L'"original" ha de ser sempre una paraula o frase sencera, mai una part d'una paraula. Per exemple, si veus "acabo", no proposis corregir "cabo" perquè és una subcadena d'una paraula més llarga.
 
-Retorna ÚNICAMENT un array JSON (sense cap text addicional):
-[{{"original": "...", "correccio": "...", "motiu": "...", "frase": "...", "confiança": 0.95}}]
-Si no hi ha errors, retorna [].
-            """,
-            expected_output="Array JSON de correccions amb camp 'confiança'",
-            agent=agent
-        )
+Retorna ÚNICAMENT un objecte JSON amb la llista de correccions a "correccions" (sense cap text addicional):
+{{"correccions": [{{"original": "...", "correccio": "...", "motiu": "...", "frase": "...", "confiança": 0.95}}]}}
+Si no hi ha errors, retorna {{"correccions": []}}.
+            """
 
-        if os.getenv('GENERA_LOG', '').upper() == 'TRUE':
-            from datetime import datetime
-            separator = '-' * 90
-            log_entry = (
-                f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"{separator}\n"
-                f"Vocabulari:\n{vocab_text}\n\n"
-                f"Semàntic:\n{semantic_section}\n\n"
-                f"Referència:\n{ref_section}\n"
-                f"{separator}\n"
-            )
-            log_path = Path(__file__).resolve().parent.parent / 'data' / 'log-correccio-transcripcio.txt'
-            log_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+    def _run_detection(self, transcript_section: str, vocab_text: str, semantic_section: str,
+                       ref_section: str, emit=None) -> list[dict]:
+        """Una crida al LLM en streaming; retorna la llista de correccions proposades.
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = self._kickoff_with_retry(crew)
-
-        raw = result.raw if hasattr(result, 'raw') else str(result)
-        corrections = repair_json(raw, return_objects=True) or []
-        if not isinstance(corrections, list):
-            corrections = []
-
-        # Filtrar correccions on l'original és sempre subcadena d'una paraula més llarga
-        def is_whole_word(word, text):
-            return bool(re.search(r'(?<!\w)' + re.escape(word) + r'(?!\w)', text))
-
-        corrections = [
-            c for c in corrections
-            if isinstance(c, dict) and 'original' in c and is_whole_word(c['original'], transcript)
-        ]
-
-        return transcript, corrections
-
-    def _kickoff_with_retry(self, crew: Crew, max_retries: int = 4):
-        """Executa crew.kickoff() amb reintents exponencials en cas de 429."""
-        delay = 30
-        for attempt in range(max_retries):
-            try:
-                return crew.kickoff()
-            except Exception as e:
-                is_rate_limit = '429' in str(e) or 'Too Many Requests' in str(e) or 'rate_limit' in str(e).lower()
-                if is_rate_limit and attempt < max_retries - 1:
-                    print(f"[TranscriptCorrector] 429 rate limit, reintent {attempt + 1}/{max_retries - 1} en {delay}s...")
-                    time.sleep(delay)
-                    delay = min(delay * 2, 120)
-                else:
-                    raise
+        Si el model ho admet, la sortida es restringeix a l'esquema CorrectionList.
+        Cada objecte es valida amb Correction quan es tanca; els que no compleixen
+        l'esquema es descarten i es compten.
+        """
+        prompt = self._detection_prompt(transcript_section, vocab_text, semantic_section, ref_section)
+        parser = JSONArrayStream()
+        corrections = []
+        invalid = 0
+        with _call_slots:
+            for item in self.llm.stream_items(prompt, role=CORRECTOR_ROLE, schema=CorrectionList,
+                                              label='TranscriptCorrector', kind='correccio', parser=parser):
+                try:
+                    c = Correction.model_validate(item).model_dump()
+                except ValidationError:
+                    invalid += 1
+                    continue
+                corrections.append(c)
+                if emit:
+                    emit(c)
+        invalid += len(parser.invalid)
+        if invalid:
+            print(f"[TranscriptCorrector] {invalid} correccions descartades per format invàlid")
+        return corrections
 
-    def apply(self, transcript: str, corrections: list[dict]) -> str:
-        """Aplica les correccions aprovades a la transcripció."""
-        for c in corrections:
-            transcript = re.sub(
-                r'(?<!\w)' + re.escape(c['original']) + r'(?!\w)',
-                c['correccio'],
-                transcript
-            )
-        return transcript
+    def apply(self, transcript: str, corrections: list) -> str:
+        """Aplica les correccions aprovades a la transcripció en una sola passada.
 
-    def _load_global_memorized(self) -> dict:
+        Usa les posicions dels CorrectionRecord retornats per detect(); les
+        correccions sense posicions vàlides per a aquest text es resolen de nou.
+        """
+        return apply_corrections(transcript, corrections)
+
+    def _global_memorized_path(self) -> Path | None:
         if not self.semantic_memory_path:
-            return {}
-        current = self.semantic_memory_path.parent
-        for _ in range(6):
-            candidate = current / 'zConfig' / 'Canvis-Memoritzats.md'
-            if candidate.exists():
-                break
-            current = current.parent
-        else:
-            return {}
-        result = {}
-        for line in candidate.read_text(encoding='utf-8').splitlines():
-            m = re.match(r'^-\s+(.+?)\s+→\s+(.+)$', line)
-            if m:
-                result[m.group(1)] = m.group(2)
-        return result
+            return None
+        return alias_store.find_global_memorized(self.semantic_memory_path.parent)
+
+    def _memorized_matcher(self):
+        return alias_store.alias_matcher(self._global_memorized_path(), self.semantic_memory_path)
+
+    def _load_global_memorized(self) -> dict:
+        return alias_store.global_aliases(self._global_memorized_path())
 
     def _load_local_memorized(self) -> dict:
-        if not self.semantic_memory_path or not self.semantic_memory_path.exists():
-            return {}
-        try:
-            import json
-            data = json.loads(self.semantic_memory_path.read_text(encoding='utf-8'))
-            return data.get('aliases', {})
-        except Exception:
-            return {}
-
-    def _format_vocab(self) -> str:
-        lines = []
-        for seccio, paraules in self.vocab.items():
-            if seccio == 'Configuració':
-                continue
-            lines.append(f"{seccio}: {', '.join(paraules)}")
-        return '\n'.join(lines)
+        return alias_store.local_aliases(self.semantic_memory_path)
+
+    def _format_vocab(self, transcript: str = None, index: TranscriptIndex = None) -> str:
+        """Vocabulari per al prompt: sencer, o només els termes rellevants per a transcript."""
+        if transcript is None:
+            return format_vocab(self.vocab)
+        return self.vocab_selector.format(transcript, index)
@@ -0,0 +1,89 @@
+"""
+Índex de paraules i n-grames d'una transcripció
+Es tokenitza el text un sol cop (seqüències \\w+) i cada paraula i n-grama de
+fins a MAX_NGRAM paraules, normalitzat a minúscules, apunta a les posicions on
+comença. Preguntar si una expressió hi apareix com a paraula sencera, quantes
+vegades o on, costa O(k) en el nombre d'aparicions en lloc de recórrer tot el
+text amb una expressió regular per a cada consulta.
+
+La semàntica és la mateixa que (?<!\\w)expressió(?!\\w): es comparen les
+paraules a l'índex i després el text exacte, separadors inclosos.
+"""
+
+import re
+import bisect
+
+WORD_RE = re.compile(r'\w+')
+MAX_NGRAM = 3
+
+
+def normalize(text: str) -> str:
+    return text.casefold()
+
+
+class TranscriptIndex:
+    def __init__(self, text: str, max_ngram: int = MAX_NGRAM):
+        self.text = text
+        self.max_ngram = max_ngram
+        self.tokens: list[tuple[int, int]] = [(m.start(), m.end()) for m in WORD_RE.finditer(text)]
+        self._ngrams: dict[tuple[str, ...], list[int]] = {}   # n-grama → índex del primer token
+        words = [normalize(text[s:e]) for s, e in self.tokens]
+        for i in range(len(words)):
+            for n in range(1, min(max_ngram, len(words) - i) + 1):
+                self._ngrams.setdefault(tuple(words[i:i + n]), []).append(i)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def positions(self, phrase: str, exact: bool = True) -> list[tuple[int, int]]:
+        """(inici, fi) de cada aparició de phrase com a paraula sencera, en ordre.
+
+        Amb exact=False no es distingeixen majúscules i minúscules.
+        """
+        if not phrase:
+            return []
+        words = [normalize(w) for w in WORD_RE.findall(phrase)]
+        if not (words and WORD_RE.match(phrase[0]) and WORD_RE.match(phrase[-1])):
+            # Comença o acaba amb puntuació: els límits no coincideixen amb els tokens
+            flags = 0 if exact else re.IGNORECASE
+            pattern = re.compile(r'(?<!\w)' + re.escape(phrase) + r'(?!\w)', flags)
+            return [(m.start(), m.end()) for m in pattern.finditer(self.text)]
+        target = phrase if exact else normalize(phrase)
+        result = []
+        for i in self._ngrams.get(tuple(words[:self.max_ngram]), ()):
+            j = i + len(words) - 1
+            if j >= len(self.tokens):
+                break
+            start, end = self.tokens[i][0], self.tokens[j][1]
+            candidate = self.text[start:end]
+            if (candidate if exact else normalize(candidate)) == target:
+                result.append((start, end))
+        return result
+
+    def contains(self, phrase: str, exact: bool = True) -> bool:
+        return bool(self.positions(phrase, exact))
+
+    def count(self, phrase: str, exact: bool = True) -> int:
+        return len(self.positions(phrase, exact))
+
+    def uncovered(self, original: str, correccio: str) -> list[tuple[int, int]]:
+        """Aparicions d'original que no formen part d'una aparició de correccio.
+
+        Si el terme correcte ja hi és ("Xavier Puig"), corregir-ne una part
+        ("Puig" → "Xavier Puig") el duplicaria.
+        """
+        found = self.positions(original)
+        if not found or original not in correccio:
+            return found
+        inside = self.positions(correccio)
+        if not inside:
+            return found
+        starts = [s for s, _ in inside]
+        result = []
+        for start, end in found:
+            # Totes les aparicions de correccio fan el mateix: la darrera que comença abans és la que arriba més lluny
+            i = bisect.bisect_right(starts, start)
+            if i and end <= inside[i - 1][1]:
+                continue
+            result.append((start, end))
+        return result
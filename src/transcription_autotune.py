@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Calibratge automàtic de WhisperModel per a la CPU d'aquesta màquina
+Inspecciona el host (nuclis, AVX, memòria), prova configuracions amb un clip
+de referència curt i desa el perfil més ràpid a config/whisper_profile.json.
+transcribe_test_2.py el carrega automàticament.
+
+Es compara el temps d'una sola transcripció, que és com treballen tots els
+usuaris del model (transcribe(), el servidor i el dimoni en fan una cada cop).
+Per això no es calibra num_workers: dues feines concurrents amb la meitat de
+fils donen més throughput combinat però fan més lenta cada transcripció.
+
+Ús:
+    python src/transcription_autotune.py clip_referencia.mp3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+import transcribe_test_2 as tt
+
+CANDIDATE_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+CANDIDATE_BATCH_SIZES = [4, 8, 16]
+# Memòria mínima (GB) per provar lots de 16
+MIN_GB_FOR_LARGE_BATCH = 12
+
+
+def probe_host() -> dict:
+    """Retorna nuclis, extensions SIMD, memòria i compute types suportats."""
+    cores = os.cpu_count() or 1
+    flags = set()
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/cpuinfo', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('flags'):
+                        flags = set(line.split(':', 1)[1].split())
+                        break
+        except OSError:
+            pass
+    elif sys.platform == 'darwin':
+        try:
+            out = subprocess.run(
+                ['sysctl', '-n', 'machdep.cpu.features', 'machdep.cpu.leaf7_features'],
+                capture_output=True, text=True, timeout=5
+            ).stdout
+            flags = {f.lower() for f in out.split()}
+        except (OSError, subprocess.SubprocessError):
+            pass
+    simd = sorted(f for f in flags if f.startswith('avx') or f in ('fma', 'f16c'))
+
+    try:
+        mem_gb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        mem_gb = 0.0
+
+    import ctranslate2
+    supported = ctranslate2.get_supported_compute_types('cpu')
+
+    return {
+        "machine": platform.machine(),
+        "cpu_count": cores,
+        "simd": simd,
+        "memory_gb": round(mem_gb, 1),
+        "supported_compute_types": sorted(supported),
+    }
+
+
+def _measure(audio, audio_s: float, compute_type: str, cpu_threads: int, batch_size: int = 0) -> float:
+    """Retorna la velocitat d'una sola transcripció (segons d'àudio per segon de rellotge)."""
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+
+    model = WhisperModel(tt.MODEL_ID, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    pipeline = BatchedInferencePipeline(model=model) if batch_size else model
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+
+    t0 = time.time()
+    segments, _info = pipeline.transcribe(audio, language="ca", beam_size=tt.BEAM_SIZE,
+                                          initial_prompt=tt.INITIAL_PROMPT, **kwargs)
+    for _seg in segments:
+        pass
+    elapsed = time.time() - t0
+    throughput = audio_s / elapsed
+    label = f"{compute_type} · threads={cpu_threads}" + (f" · batch={batch_size}" if batch_size else "")
+    print(f"  {label:<48} {throughput:6.2f}x")
+    return throughput
+
+
+def calibrate(reference_clip: str) -> dict:
+    from audio_cache import decoded_audio
+
+    host = probe_host()
+    print(f"🖥️  {host['machine']} · {host['cpu_count']} nuclis · {host['memory_gb']} GB · "
+          f"SIMD: {', '.join(host['simd']) or '—'}")
+
+    audio = decoded_audio(reference_clip)
+    audio_s = len(audio) / 16000
+    cores = host["cpu_count"]
+    roomy = host["memory_gb"] >= MIN_GB_FOR_LARGE_BATCH
+
+    # 1. compute type (amb tots els nuclis)
+    print("\n1/3 Tipus de càlcul")
+    compute_types = [c for c in CANDIDATE_COMPUTE_TYPES if c in host["supported_compute_types"]] or ["float32"]
+    best_ct = max(compute_types, key=lambda ct: _measure(audio, audio_s, ct, cores))
+
+    # 2. cpu_threads
+    print("\n2/3 Fils per model")
+    thread_options = sorted({cores, max(1, cores // 2), max(1, cores * 3 // 4)}, reverse=True)
+    scores = {t: _measure(audio, audio_s, best_ct, t) for t in thread_options}
+    best_threads = max(scores, key=scores.get)
+    best_score = scores[best_threads]
+
+    # 3. batch_size per al mode lot
+    print("\n3/3 Mida de lot")
+    batch_options = [b for b in CANDIDATE_BATCH_SIZES if roomy or b <= 8]
+    batch_scores = {b: _measure(audio, audio_s, best_ct, best_threads, batch_size=b) for b in batch_options}
+    best_batch = max(batch_scores, key=batch_scores.get)
+
+    return {
+        "model": tt.MODEL_ID,
+        "compute_type": best_ct,
+        "cpu_threads": best_threads,
+        "batch_size": best_batch,
+        "throughput": round(best_score, 2),
+        "batch_throughput": round(batch_scores[best_batch], 2),
+        "host": host,
+        "reference_clip": os.path.basename(reference_clip),
+        "date": datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra WhisperModel per a aquesta màquina")
+    parser.add_argument("clip", help="Clip d'àudio de referència (30-120 s recomanat)")
+    parser.add_argument("--output", "-o", default=str(tt.PROFILE_PATH), help="On desar el perfil")
+    args = parser.parse_args()
+
+    if not tt.check_dependencies():
+        sys.exit(1)
+    if not os.path.exists(args.clip):
+        print(f"ERROR: No es troba el fitxer: {args.clip}")
+        sys.exit(1)
+
+    profile = calibrate(args.clip)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ Perfil: {profile['compute_type']} · threads={profile['cpu_threads']} · "
+          f"batch={profile['batch_size']} "
+          f"({profile['throughput']}x temps real)")
+    print(f"💾 Desat a {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark de transcripció: models × compute_type × beam_size × cpu_threads × num_workers
+Cada combinació de càrrega s'executa en un procés nou per mesurar el temps de
+càrrega i el pic de memòria (RSS) de manera independent.
+
+Ús:
+    python src/transcription_benchmark.py corpus/ --beams 1 5 --workers 1 2
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from pathlib import Path
+from datetime import datetime
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import transcribe_test_2 as tt
+
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+BEAM_SIZES = [1, 5]
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / 'data' / 'benchmarks'
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux retorna KB; macOS retorna bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_config(model_id: str, compute_type: str, cpu_threads: int, num_workers: int,
+                beam_sizes: list[int], corpus: list[str], use_prompt: bool) -> list[dict]:
+    """S'executa en un procés fill: carrega el model i transcriu el corpus amb cada beam_size."""
+    from faster_whisper import WhisperModel
+    from audio_cache import decoded_audio
+
+    base = {
+        "model": model_id,
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads,
+        "num_workers": num_workers,
+    }
+
+    t0 = time.time()
+    model = WhisperModel(model_id, device=tt.DEVICE, compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=num_workers)
+    load_time = time.time() - t0
+
+    # Àudio descodificat de la memòria cau (mmap): només es mesura la inferència
+    audios = [decoded_audio(p) for p in corpus]
+    audio_s = sum(len(a) for a in audios) / 16000
+    prompt = tt.INITIAL_PROMPT if use_prompt else None
+
+    def _one(audio, beam_size):
+        segments, _ = model.transcribe(audio, language="ca", beam_size=beam_size, initial_prompt=prompt)
+        for _ in segments:
+            pass
+
+    rows = []
+    for beam_size in beam_sizes:
+        t1 = time.time()
+        # num_workers > 1 només té efecte amb crides concurrents al model
+        with ThreadPoolExecutor(max_workers=num_workers) as pool:
+            list(pool.map(lambda a: _one(a, beam_size), audios))
+        elapsed = time.time() - t1
+        rows.append(dict(
+            base,
+            beam_size=beam_size,
+            load_time=round(load_time, 2),
+            audio_s=round(audio_s, 1),
+            elapsed_s=round(elapsed, 2),
+            rtf=round(elapsed / audio_s, 4) if audio_s else 0.0,
+            peak_rss_mb=round(_peak_rss_mb(), 1),
+            error="",
+        ))
+    return rows
+
+
+def run_benchmark(corpus: list[Path], models: list[str], compute_types: list[str], beam_sizes: list[int],
+                  cpu_threads: list[int], num_workers: list[int], use_prompt: bool = True) -> list[dict]:
+    ctx = get_context("spawn")
+    rows = []
+    grid = list(itertools.product(models, compute_types, cpu_threads, num_workers))
+    for i, (model_id, compute_type, threads, workers) in enumerate(grid, 1):
+        print(f"[{i}/{len(grid)}] {model_id} · {compute_type} · threads={threads} · workers={workers}")
+        # Un procés nou per configuració: el pic de RSS no es contamina entre proves
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            future = pool.submit(_run_config, model_id, compute_type, threads, workers,
+                                 beam_sizes, [str(p) for p in corpus], use_prompt)
+            try:
+                config_rows = future.result()
+            except Exception as e:
+                print(f"  ❌ {e}")
+                config_rows = [{
+                    "model": model_id, "compute_type": compute_type, "cpu_threads": threads,
+                    "num_workers": workers, "beam_size": b, "load_time": None, "audio_s": None,
+                    "elapsed_s": None, "rtf": None, "peak_rss_mb": None, "error": str(e),
+                } for b in beam_sizes]
+        for r in config_rows:
+            if not r["error"]:
+                print(f"  beam={r['beam_size']}: càrrega {r['load_time']:.1f}s · RTF {r['rtf']:.3f} · "
+                      f"RSS {r['peak_rss_mb']:.0f} MB")
+        rows.extend(config_rows)
+    return rows
+
+
+def save_report(rows: list[dict], output: Path | None = None) -> tuple[Path, Path]:
+    if output is None:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output = OUTPUT_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    csv_path = output.with_suffix('.csv')
+    json_path = output.with_suffix('.json')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    json_path.write_text(json.dumps({
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "cpu_count": os.cpu_count(),
+        "platform": sys.platform,
+        "results": rows,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    return csv_path, json_path
+
+
+def print_ranking(rows: list[dict]):
+    ok = sorted((r for r in rows if not r["error"]), key=lambda r: r["rtf"])
+    print(f"\n{'─'*96}")
+    print(f"{'Model':<52} {'Tipus':<13} {'Fils':>4} {'Wrk':>3} {'Beam':>4} {'RTF':>7} {'RSS MB':>8}")
+    print(f"{'─'*96}")
+    for r in ok:
+        print(f"{r['model'][-52:]:<52} {r['compute_type']:<13} {r['cpu_threads']:>4} {r['num_workers']:>3} "
+              f"{r['beam_size']:>4} {r['rtf']:>7.3f} {r['peak_rss_mb']:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de models i configuracions de transcripció")
+    parser.add_argument("corpus", nargs="+", help="Fitxers d'àudio o directoris del corpus fix")
+    parser.add_argument("--models", nargs="+", default=tt.CANDIDATE_MODELS)
+    parser.add_argument("--compute-types", nargs="+", default=COMPUTE_TYPES)
+    parser.add_argument("--beams", nargs="+", type=int, default=BEAM_SIZES)
+    parser.add_argument("--threads", nargs="+", type=int, default=[0],
+                        help="Valors de cpu_threads (0 = per defecte de CTranslate2)")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1], help="Valors de num_workers")
+    parser.add_argument("--sense-prompt", action="store_true", help="Desactiva l'initial_prompt")
+    parser.add_argument("--output", "-o", default=None, help="Prefix dels fitxers d'informe (.csv i .json)")
+    args = parser.parse_args()
+
+    if not tt.check_dependencies():
+        sys.exit(1)
+    corpus = tt.collect_audio_files(args.corpus)
+    if not corpus:
+        sys.exit(1)
+
+    rows = run_benchmark(corpus, args.models, args.compute_types, args.beams,
+                         args.threads, args.workers, use_prompt=not args.sense_prompt)
+    print_ranking(rows)
+    csv_path, json_path = save_report(rows, Path(args.output) if args.output else None)
+    print(f"\n💾 Informe: {csv_path}\n💾 Informe: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Memòria cau de transcripcions adreçada per contingut
+Clau: hash de l'àudio + MODEL_ID + COMPUTE_TYPE + beam_size + hash de l'initial_prompt.
+Els segments es desen com a JSON compacte comprimit amb gzip; quan la mida
+total supera el límit s'eliminen les entrades menys usades (LRU per mtime).
+
+Ús:
+    python src/transcription_cache.py inspect
+    python src/transcription_cache.py purge [--dies N]
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'transcription_cache'
+MAX_CACHE_MB = int(os.getenv('TRANSCRIPCIO_CACHE_MB', '500'))
+
+
+def file_sha256(path) -> str:
+    """Hash SHA-256 del contingut d'un fitxer, llegit per blocs."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _encode_segment(seg: dict) -> list:
+    """[inici, fi, text, avg_logprob, no_speech_prob, paraules]; els camps opcionals buits s'ometen."""
+    row = [round(seg['start'], 2), round(seg['end'], 2), seg['text'],
+           seg.get('avg_logprob'), seg.get('no_speech_prob'), seg.get('words')]
+    while len(row) > 3 and row[-1] is None:
+        row.pop()
+    return row
+
+
+def _decode_segment(row: list) -> dict:
+    seg = {'start': row[0], 'end': row[1], 'text': row[2]}
+    for name, value in zip(('avg_logprob', 'no_speech_prob', 'words'), row[3:]):
+        if value is not None:
+            seg[name] = value
+    return seg
+
+
+class TranscriptionCache:
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_MB * 1024 * 1024):
+        self.dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def make_key(self, audio_hash: str, model_id: str, compute_type: str, beam_size: int, prompt: str | None,
+                 word_probs: bool = False, batch_size: int = 0) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest() if prompt else '-'
+        raw = f"{audio_hash}|{model_id}|{compute_type}|{beam_size}|{prompt_hash}"
+        if word_probs:
+            raw += "|words"
+        # El pipeline per lots segmenta (i de vegades transcriu) diferent del seqüencial
+        if batch_size:
+            raw += f"|batch{batch_size}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json.gz"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)   # marca l'accés per a l'LRU
+        data['segments'] = [_decode_segment(seg) for seg in data['segments']]
+        return data
+
+    def put(self, key: str, result: dict, audio_name: str = ''):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            'audio': audio_name,
+            'duration': result['duration'],
+            'language': result['language'],
+            'language_prob': result['language_prob'],
+            'segments': [_encode_segment(s) for s in result['segments']],
+        }
+        tmp = self._path(key).with_suffix('.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        tmp.replace(self._path(key))
+        self.evict()
+
+    def entries(self) -> list[Path]:
+        """Entrades de la memòria cau, de la menys usada a la més recent."""
+        if not self.dir.exists():
+            return []
+        return sorted(self.dir.glob('*.json.gz'), key=lambda p: p.stat().st_mtime)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(p.stat().st_size for p in entries)
+        for p in entries:
+            if total <= self.max_bytes:
+                break
+            total -= p.stat().st_size
+            p.unlink(missing_ok=True)
+
+    def purge(self, older_than_days: float | None = None) -> int:
+        limit = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        removed = 0
+        for p in self.entries():
+            if limit is None or p.stat().st_mtime < limit:
+                p.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def _inspect(cache: TranscriptionCache):
+    entries = cache.entries()
+    total = 0
+    print(f"Directori: {cache.dir}")
+    print(f"{'Clau':<14} {'Mida':>9}  {'Últim ús':<16}  Àudio")
+    for p in reversed(entries):
+        st = p.stat()
+        total += st.st_size
+        try:
+            with gzip.open(p, 'rt', encoding='utf-8') as f:
+                audio = json.load(f).get('audio', '')
+        except (OSError, ValueError):
+            audio = '(malmès)'
+        last = time.strftime('%Y-%m-%d %H:%M', time.localtime(st.st_mtime))
+        print(f"{p.name[:12]:<14} {st.st_size / 1024:7.1f}KB  {last:<16}  {audio}")
+    print(f"\n{len(entries)} entrades · {total / 1024 / 1024:.1f} MB de {cache.max_bytes / 1024 / 1024:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecciona o buida la memòria cau de transcripcions")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('inspect', help="Llista les entrades i la mida total")
+    p_purge = sub.add_parser('purge', help="Elimina entrades")
+    p_purge.add_argument('--dies', type=float, default=None,
+                         help="Només les entrades no usades en aquests dies (per defecte, totes)")
+    args = parser.parse_args()
+
+    cache = TranscriptionCache()
+    if args.cmd == 'inspect':
+        _inspect(cache)
+    else:
+        print(f"🗑️  {cache.purge(args.dies)} entrades eliminades")
+
+
+if __name__ == '__main__':
+    main()
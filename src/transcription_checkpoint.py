@@ -0,0 +1,81 @@
+"""
+Punts de control de transcripcions llargues
+Els segments acabats s'afegeixen a un fitxer JSONL al costat de l'àudio
+(<àudio>.checkpoint.jsonl) i es bolquen a disc periòdicament. Si la
+transcripció s'interromp, es pot reprendre des de l'últim offset desat.
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+
+# Cada quants segons de rellotge es força l'escriptura a disc
+CHECKPOINT_EVERY_S = 30.0
+
+
+def checkpoint_path(audio_path) -> Path:
+    audio_path = Path(audio_path)
+    return audio_path.with_name(audio_path.name + '.checkpoint.jsonl')
+
+
+class TranscriptionCheckpoint:
+    def __init__(self, audio_path, header: dict, every_s: float = CHECKPOINT_EVERY_S):
+        audio_path = Path(audio_path)
+        self.path = checkpoint_path(audio_path)
+        # La capçalera identifica la configuració: un checkpoint d'una altra
+        # configuració (model, prompt...) no es pot reprendre
+        self.header = dict(header, size=audio_path.stat().st_size)
+        self.every_s = every_s
+        self._file = None
+        self._last_flush = 0.0
+
+    def load(self) -> list[dict]:
+        """Retorna els segments desats si el checkpoint és compatible; [] altrament."""
+        if not self.path.exists():
+            return []
+        segments = []
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return []
+        try:
+            if json.loads(lines[0]) != self.header:
+                print("⚠️  Checkpoint d'una altra configuració: es comença de zero")
+                return []
+        except ValueError:
+            return []
+        for line in lines[1:]:
+            try:
+                segments.append(json.loads(line))
+            except ValueError:
+                break   # última línia a mig escriure
+        return segments
+
+    def open(self, segments: list[dict]):
+        """Reescriu el checkpoint amb la capçalera i els segments ja fets, i el deixa obert per afegir-n'hi."""
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(self.header, ensure_ascii=False) + '\n')
+        for seg in segments:
+            self._file.write(json.dumps(seg, ensure_ascii=False) + '\n')
+        self._flush()
+
+    def append(self, segment: dict):
+        self._file.write(json.dumps(segment, ensure_ascii=False) + '\n')
+        if time.time() - self._last_flush >= self.every_s:
+            self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.time()
+
+    def close(self):
+        if self._file:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
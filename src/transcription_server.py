@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Servidor de transcripció amb el model BSC sempre carregat
+El model es carrega una sola vegada i atén moltes feines per socket local.
+
+La connexió (multiprocessing.connection) desserialitza amb pickle el que rep,
+de manera que la clau d'autenticació ha de ser secreta: es pren de
+TRANSCRIPCIO_AUTHKEY o, si no hi és, d'un fitxer data/transcription_server.key
+(0600) que el servidor genera amb una clau aleatòria el primer cop.
+
+Ús:
+    python src/transcription_server.py                 # arrenca el servidor
+    python src/transcribe_test_2.py fitxer.mp3 --servidor
+"""
+
+import os
+import sys
+import stat
+import secrets
+import argparse
+import threading
+from pathlib import Path
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+import transcribe_test_2 as tt
+
+# ─────────────────────────────────────────────
+# CONFIGURACIÓ
+# ─────────────────────────────────────────────
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv("TRANSCRIPCIO_PORT", "50555"))
+KEY_PATH = Path(__file__).resolve().parent.parent / "data" / "transcription_server.key"
+
+REQUEST_FIELDS = {"cmd": str, "audio": str, "use_prompt": bool, "prompt": (str, type(None)),
+                  "hotwords": (str, type(None))}
+COMMANDS = ("transcribe", "stats", "shutdown")
+
+
+def load_authkey(create: bool = False, key_path: Path = KEY_PATH) -> bytes:
+    """Clau d'autenticació: TRANSCRIPCIO_AUTHKEY o el fitxer de clau (el servidor el crea si cal)."""
+    env_key = os.getenv("TRANSCRIPCIO_AUTHKEY")
+    if env_key:
+        return env_key.encode("utf-8")
+    if not key_path.exists():
+        if not create:
+            raise RuntimeError(
+                f"No es troba la clau del servidor ({key_path}). "
+                f"Arrenca el servidor o defineix TRANSCRIPCIO_AUTHKEY"
+            )
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass   # un altre procés l'acaba de crear
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(secrets.token_hex(32))
+    if key_path.stat().st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise RuntimeError(f"La clau {key_path} és accessible per altres usuaris: fes chmod 600")
+    return key_path.read_text(encoding="utf-8").strip().encode("utf-8")
+
+
+def valid_request(request) -> bool:
+    """Petició amb la forma esperada: un dict amb camps coneguts i del tipus correcte."""
+    if not isinstance(request, dict) or request.get("cmd", "transcribe") not in COMMANDS:
+        return False
+    return all(k in REQUEST_FIELDS and isinstance(v, REQUEST_FIELDS[k]) for k, v in request.items())
+
+
+class TranscriptionServer:
+    def __init__(self, host: str = HOST, port: int = PORT, authkey: bytes = None):
+        self.address = (host, port)
+        self.authkey = authkey or load_authkey(create=True)
+        self.model = None
+        self.load_time = 0.0
+        self.jobs_done = 0
+        self._lock = threading.Lock()   # un sol model → una feina alhora
+        self._stop = threading.Event()
+
+    def serve_forever(self):
+        self.model, self.load_time = tt.load_model()
+        print(f"🟢 Servidor escoltant a {self.address[0]}:{self.address[1]} "
+              f"(model carregat en {self.load_time:.1f}s)\n")
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            while not self._stop.is_set():
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    continue   # inclou els clients sense la clau correcta
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if not valid_request(request):
+                    conn.send({"ok": False, "error": "Petició no vàlida"})
+                    continue
+                cmd = request.get("cmd", "transcribe")
+                if cmd == "stats":
+                    conn.send({"ok": True, "result": self._stats()})
+                elif cmd == "shutdown":
+                    conn.send({"ok": True, "result": self._stats()})
+                    self._stop.set()
+                    # Despertar l'accept() bloquejat perquè el bucle principal acabi
+                    try:
+                        Client(self.address, authkey=self.authkey).close()
+                    except OSError:
+                        pass
+                    return
+                else:
+                    conn.send(self._transcribe(request))
+
+    def _transcribe(self, request: dict) -> dict:
+        audio = request.get("audio", "")
+        if not os.path.exists(audio):
+            return {"ok": False, "error": f"No es troba el fitxer: {audio}"}
+        try:
+            with self._lock:
+                result = tt.transcribe(audio, use_prompt=request.get("use_prompt", True), model=self.model,
+                                       prompt=request.get("prompt"), hotwords=request.get("hotwords"))
+                self.jobs_done += 1
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        print(f"📋 Feina {self.jobs_done}: {os.path.basename(audio)} — "
+              f"{result['duration']:.1f}s d'àudio en {result['elapsed']:.1f}s "
+              f"(RTF {result['rtf']:.3f})")
+        return {"ok": True, "result": result}
+
+    def _stats(self) -> dict:
+        return {
+            "model": tt.MODEL_ID,
+            "compute_type": tt.COMPUTE_TYPE,
+            "load_time": self.load_time,
+            "jobs_done": self.jobs_done,
+        }
+
+
+def _request(payload: dict, host: str = HOST, port: int = PORT, authkey: bytes = None):
+    with Client((host, port), authkey=authkey or load_authkey()) as conn:
+        conn.send(payload)
+        response = conn.recv()
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Error desconegut al servidor"))
+    return response["result"]
+
+
+def transcribe_remote(audio_path: str, use_prompt: bool = True, host: str = HOST, port: int = PORT,
+                      prompt: str | None = None, hotwords: str | None = None) -> dict:
+    """Envia una feina al servidor i retorna el mateix dict que transcribe()."""
+    request = {"cmd": "transcribe", "audio": audio_path, "use_prompt": use_prompt,
+               "prompt": prompt, "hotwords": hotwords}
+    try:
+        return _request(request, host, port)
+    except ConnectionRefusedError:
+        raise RuntimeError(
+            f"No hi ha cap servidor de transcripció a {host}:{port}. "
+            f"Arrenca'l amb: python src/transcription_server.py"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidor de transcripció amb el model BSC carregat en memòria"
+    )
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port local (per defecte {PORT})")
+    parser.add_argument("--estat", action="store_true", help="Mostra l'estat d'un servidor en marxa")
+    parser.add_argument("--aturar", action="store_true", help="Atura un servidor en marxa")
+    args = parser.parse_args()
+
+    if args.estat or args.aturar:
+        stats = _request({"cmd": "shutdown" if args.aturar else "stats"}, port=args.port)
+        print(f"Model:          {stats['model']} ({stats['compute_type']})")
+        print(f"Temps càrrega:  {stats['load_time']:.1f}s")
+        print(f"Feines fetes:   {stats['jobs_done']}")
+        return
+
+    if not tt.check_dependencies():
+        sys.exit(1)
+
+    server = TranscriptionServer(port=args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServidor aturat")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Selecció del vocabulari rellevant per a cada prompt
+En lloc d'enviar tot Vocabulari.md a cada crida, els termes es puntuen segons
+la transcripció i la sèrie de reunions, i només s'envien els millors fins a un
+pressupost de tokens:
+  - apareix a la transcripció (paraula sencera, sense distingir majúscules)
+  - s'assembla fonèticament a alguna expressió de la transcripció (phonetic_index)
+  - surt als projectes o termes tècnics de semantic_memory.json de la sèrie
+  - s'ha fet servir recentment en correccions (data/vocab_usage.json)
+Es manté l'ordre original de seccions i termes (prompts estables per a la
+memòria cau). Si el vocabulari sencer ja hi cap, no es retalla res.
+
+Pressupost: 'pressupost_vocabulari' a la secció Configuració de Vocabulari.md,
+o la variable VOCAB_TOKENS (0 = sense límit). 'max_termes' limita el nombre.
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+
+import alias_store
+from phonetic_index import index_for, clean_term, SKIP_SECTIONS
+from rate_limiter import estimate_tokens
+from transcript_index import TranscriptIndex, WORD_RE, normalize
+
+TOKEN_BUDGET = int(os.getenv('VOCAB_TOKENS', '1500'))
+USAGE_PATH = Path(__file__).resolve().parent.parent / 'data' / 'vocab_usage.json'
+USAGE_HALF_LIFE_DAYS = 30
+
+# Pes de cada senyal en la puntuació d'un terme
+W_PRESENT = 3.0
+W_PHONETIC = 2.0
+W_SEMANTIC = 1.5
+W_USAGE = 1.0
+
+_usage_lock = threading.Lock()
+_totals = {'calls': 0, 'tokens_full': 0, 'tokens_selected': 0}
+
+
+def _config(vocab: dict) -> dict:
+    config = {}
+    for item in vocab.get('Configuració', []):
+        if ':' in item:
+            k, _, v = item.partition(':')
+            config[k.strip()] = v.strip()
+    return config
+
+
+def _load_usage() -> dict:
+    try:
+        data = json.loads(USAGE_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def record_usage(terms):
+    """Anota que aquests termes s'han fet servir ara (correccions acceptades o memoritzades en revisar)."""
+    terms = {normalize(clean_term(t)) for t in terms if t}
+    if not terms:
+        return
+    now = time.time()
+    with _usage_lock:
+        usage = _load_usage()
+        for term in terms:
+            count = usage.get(term, {}).get('count', 0)
+            usage[term] = {'last': now, 'count': count + 1}
+        USAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = USAGE_PATH.with_suffix('.tmp')
+        tmp.write_text(json.dumps(usage, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(USAGE_PATH)
+
+
+def _usage_score(entry: dict | None, now: float) -> float:
+    if not entry:
+        return 0.0
+    age_days = max(0.0, now - entry.get('last', 0)) / 86400
+    return 0.5 ** (age_days / USAGE_HALF_LIFE_DAYS) * min(1.0, math.log1p(entry.get('count', 1)) / math.log(10))
+
+
+def format_vocab(vocab: dict) -> str:
+    return '\n'.join(f"{seccio}: {', '.join(paraules)}"
+                     for seccio, paraules in vocab.items() if seccio not in SKIP_SECTIONS)
+
+
+class VocabularySelector:
+    def __init__(self, vocab: dict, semantic_memory_path: Path = None, token_budget: int = None,
+                 max_terms: int = None):
+        self.vocab = vocab
+        self.semantic_memory_path = semantic_memory_path
+        config = _config(vocab)
+        self.token_budget = token_budget if token_budget is not None else int(
+            config.get('pressupost_vocabulari', TOKEN_BUDGET))
+        self.max_terms = max_terms if max_terms is not None else int(config.get('max_termes', 0)) or None
+        self.last_stats: dict = {}
+
+    def _semantic_words(self) -> set[str]:
+        memory = alias_store.semantic_memory(self.semantic_memory_path)
+        texts = (list(memory.get('projects', [])) + list(memory.get('technical_terms', []))
+                 + list(memory.get('aliases', {}).values()))
+        return {normalize(w) for t in texts if isinstance(t, str) for w in WORD_RE.findall(t)}
+
+    def scores(self, transcript: str, index: TranscriptIndex = None) -> dict[str, float]:
+        """Puntuació de cada terme (text tal com surt a Vocabulari.md)."""
+        index = index or TranscriptIndex(transcript)
+        phonetic = {}
+        for c in index_for(self.vocab).scan(transcript):
+            phonetic[c['correccio']] = max(phonetic.get(c['correccio'], 0.0), c['confiança'])
+        semantic = self._semantic_words()
+        usage = _load_usage()
+        now = time.time()
+
+        result = {}
+        for seccio, terms in self.vocab.items():
+            if seccio in SKIP_SECTIONS:
+                continue
+            for term in terms:
+                clean = clean_term(term)
+                words = [normalize(w) for w in WORD_RE.findall(clean)]
+                score = 0.0
+                if clean and index.contains(clean, exact=False):
+                    score += W_PRESENT
+                score += W_PHONETIC * phonetic.get(clean, 0.0)
+                if words and all(w in semantic for w in words):
+                    score += W_SEMANTIC
+                score += W_USAGE * _usage_score(usage.get(normalize(clean)), now)
+                result[term] = max(result.get(term, 0.0), score)
+        return result
+
+    def select(self, transcript: str, index: TranscriptIndex = None) -> dict[str, list[str]]:
+        """Vocabulari reduït amb les mateixes seccions (les buides s'ometen) i l'ordre original."""
+        full_text = format_vocab(self.vocab)
+        tokens_full = estimate_tokens(full_text)
+        n_terms = sum(len(t) for s, t in self.vocab.items() if s not in SKIP_SECTIONS)
+        if (not self.token_budget or tokens_full <= self.token_budget) and \
+                (not self.max_terms or n_terms <= self.max_terms):
+            selected = {s: t for s, t in self.vocab.items() if s not in SKIP_SECTIONS}
+            self._record_stats(n_terms, n_terms, tokens_full, tokens_full)
+            return selected
+
+        scores = self.scores(transcript, index)
+        ranked = sorted(
+            ((seccio, i, term) for seccio, terms in self.vocab.items() if seccio not in SKIP_SECTIONS
+             for i, term in enumerate(terms)),
+            key=lambda x: -scores.get(x[2], 0.0)
+        )
+        budget = self.token_budget or float('inf')
+        used = count = 0
+        chosen: dict[str, set[int]] = {}
+        for seccio, i, term in ranked:
+            if self.max_terms and count >= self.max_terms:
+                break
+            cost = estimate_tokens(term + ', ') + (0 if seccio in chosen else estimate_tokens(f"{seccio}: \n"))
+            if used + cost > budget:
+                continue
+            used += cost
+            count += 1
+            chosen.setdefault(seccio, set()).add(i)
+
+        selected = {
+            seccio: [t for i, t in enumerate(terms) if i in chosen[seccio]]
+            for seccio, terms in self.vocab.items() if seccio in chosen
+        }
+        n_selected = sum(len(t) for t in selected.values())
+        self._record_stats(n_terms, n_selected, tokens_full, estimate_tokens(format_vocab(selected)))
+        return selected
+
+    def format(self, transcript: str, index: TranscriptIndex = None) -> str:
+        return format_vocab(self.select(transcript, index))
+
+    def _record_stats(self, n_terms: int, n_selected: int, tokens_full: int, tokens_selected: int):
+        self.last_stats = {
+            'terms_total': n_terms, 'terms_selected': n_selected,
+            'tokens_full': tokens_full, 'tokens_selected': tokens_selected,
+            'tokens_saved': tokens_full - tokens_selected,
+        }
+        with _usage_lock:
+            _totals['calls'] += 1
+            _totals['tokens_full'] += tokens_full
+            _totals['tokens_selected'] += tokens_selected
+        if n_selected < n_terms:
+            print(f"[Vocabulari] {n_selected}/{n_terms} termes · {tokens_selected} de {tokens_full} tokens "
+                  f"(−{1 - tokens_selected / tokens_full:.0%})")
+
+
+def stats() -> dict:
+    """Tokens de vocabulari estalviats en aquest procés."""
+    with _usage_lock:
+        return dict(_totals, tokens_saved=_totals['tokens_full'] - _totals['tokens_selected'])
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Dimoni de carpeta d'entrada: transcriu i arxiva les gravacions noves automàticament
+Cada àudio nou de la carpeta es transcriu amb un model sempre carregat, s'associa
+a la reunió del calendari per hora i es desa com a nota a la sèrie corresponent.
+
+La carpeta es revisa per sondeig (stat) en lloc d'inotify: funciona igual a
+macOS i Linux i no depèn de cap paquet addicional. Un fitxer només s'agafa quan
+la mida i la data de modificació no canvien entre dues revisions (còpia acabada).
+Es conserven les probabilitats per paraula per generar l'índex de trams dubtosos.
+
+Ús:
+    python src/watch_folder.py ~/Gravacions --desti "<vault>/Reunions/Altres/Reunions"
+"""
+
+import os
+import sys
+import queue
+import shutil
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+
+import transcribe_test_2 as tt
+from transcription_checkpoint import checkpoint_path
+
+POLL_S = 10.0
+MAX_PENDING = 4   # feines a la cua; si s'omple, el sondeig s'espera
+
+
+class WatchFolderDaemon:
+    def __init__(self, drop_dir: Path, obsidian, calendar=None, default_target: Path = None,
+                 poll_s: float = POLL_S, max_pending: int = MAX_PENDING):
+        self.drop_dir = Path(drop_dir).expanduser()
+        self.done_dir = self.drop_dir / 'processats'
+        self.error_dir = self.drop_dir / 'errors'
+        self.obsidian = obsidian
+        self.calendar = calendar
+        self.default_target = Path(default_target) if default_target else None
+        self.poll_s = poll_s
+        self.jobs: queue.Queue[Path] = queue.Queue(maxsize=max_pending)
+        self._seen: dict[Path, tuple[int, float]] = {}
+        self._queued: set[Path] = set()
+        self._stop = threading.Event()
+        self.model = None
+
+    def run(self):
+        self.model, _ = tt.load_model()
+        worker = threading.Thread(target=self._worker, daemon=True)
+        worker.start()
+        print(f"👀 Vigilant {self.drop_dir} (cada {self.poll_s:.0f}s, cua màxima {self.jobs.maxsize})\n")
+        try:
+            while not self._stop.is_set():
+                for path in self._stable_files():
+                    self._queued.add(path)
+                    self.jobs.put(path)   # bloqueja si la cua és plena
+                    print(f"📥 A la cua: {path.name}")
+                self._stop.wait(self.poll_s)
+        finally:
+            self._stop.set()
+
+    def stop(self):
+        self._stop.set()
+
+    def _stable_files(self) -> list[Path]:
+        """Fitxers d'àudio que no han canviat des de la revisió anterior."""
+        stable = []
+        current = {}
+        for entry in os.scandir(self.drop_dir):
+            path = Path(entry.path)
+            if not entry.is_file() or path.suffix.lower() not in tt.AUDIO_EXTENSIONS or path in self._queued:
+                continue
+            st = entry.stat()
+            current[path] = (st.st_size, st.st_mtime)
+            if self._seen.get(path) == current[path] and st.st_size > 0:
+                stable.append(path)
+        self._seen = current
+        return sorted(stable, key=lambda p: current[p][1])
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                path = self.jobs.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                note_path = self._process(path)
+                self._move(path, self.done_dir)
+                print(f"✅ {path.name} → {note_path}\n")
+            except Exception as e:
+                print(f"❌ Error processant {path.name}: {e}\n")
+                checkpoint_path(path).unlink(missing_ok=True)
+                self._move(path, self.error_dir)
+            finally:
+                self._queued.discard(path)
+                self.jobs.task_done()
+
+    def _process(self, path: Path) -> Path:
+        recorded_at = datetime.fromtimestamp(path.stat().st_mtime).astimezone()
+        meeting = self.calendar.find_event_at(recorded_at) if self.calendar else None
+        if meeting is None:
+            print(f"⚠️  Cap reunió del calendari per a {path.name}: es desa amb el nom del fitxer")
+            meeting = {'title': path.stem, 'start': recorded_at, 'attendees': [], 'duration': ''}
+        else:
+            print(f"📅 {path.name} ↔ {meeting['title']} ({meeting['start'].strftime('%d/%m/%Y %H:%M')})")
+
+        target_dir = self.obsidian.find_meeting_dir(meeting['title']) or self.default_target
+        if target_dir is None:
+            raise RuntimeError(f"No hi ha cap sèrie «{meeting['title']}» i no s'ha indicat --desti")
+
+        # Abans de transcriure: una gravació duplicada no ha de costar una passada de Whisper
+        note_path = self.obsidian.simple_note_path(meeting, target_dir)
+        if note_path.exists():
+            raise RuntimeError(f"La nota {note_path.name} ja existeix")
+
+        prompt, hotwords = tt.build_prompt(
+            self.obsidian.vault / 'Reunions' / 'zConfig' / 'Vocabulari.md', target_dir.parent
+        )
+        result = tt.transcribe(str(path), model=self.model, prompt=prompt, hotwords=hotwords,
+                               word_probs=True)
+
+        if not self.obsidian.create_simple_note(meeting, result['text'], target_dir,
+                                               segments=result['segments']):
+            raise RuntimeError(f"No s'ha pogut escriure {note_path}")
+        return note_path
+
+    def _move(self, path: Path, dest_dir: Path):
+        dest_dir.mkdir(exist_ok=True)
+        try:
+            shutil.move(str(path), str(dest_dir / path.name))
+        except OSError as e:
+            print(f"⚠️  No s'ha pogut moure {path.name}: {e}")
+
+
+def main():
+    from dotenv import load_dotenv
+    from obsidian_writer import ObsidianWriter
+
+    parser = argparse.ArgumentParser(description="Transcriu i arxiva automàticament les gravacions noves")
+    parser.add_argument("carpeta", help="Carpeta on es deixen les gravacions")
+    parser.add_argument("--desti", default=None,
+                        help="Directori de notes per a reunions sense sèrie existent")
+    parser.add_argument("--interval", type=float, default=POLL_S, help="Segons entre revisions")
+    parser.add_argument("--cua", type=int, default=MAX_PENDING, help="Màxim de feines pendents")
+    parser.add_argument("--sense-calendari", action="store_true",
+                        help="No consulta Google Calendar (les notes es desen amb el nom del fitxer)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    vault = os.getenv('OBSIDIAN_VAULT_PATH')
+    if not vault:
+        print("ERROR: OBSIDIAN_VAULT_PATH no configurat al .env")
+        sys.exit(1)
+    if not tt.check_dependencies():
+        sys.exit(1)
+    if not Path(args.carpeta).expanduser().is_dir():
+        print(f"ERROR: No es troba la carpeta: {args.carpeta}")
+        sys.exit(1)
+
+    calendar = None
+    if not args.sense_calendari:
+        from calendar_matcher import CalendarMatcher
+        calendar = CalendarMatcher()
+
+    daemon = WatchFolderDaemon(args.carpeta, ObsidianWriter(vault), calendar,
+                               default_target=args.desti, poll_s=args.interval, max_pending=args.cua)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+        print("\nAturat")
+
+
+if __name__ == "__main__":
+    main()